@@ -0,0 +1,66 @@
+"""Micro-benchmark for MarkdownReader on multi-megabyte notes.
+
+Run from the repository root:
+
+    python benchmarks/bench_parser.py --sizes 1 2 4 8
+
+Time per megabyte should stay flat as the note grows, i.e. parsing is linear.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_reader import MarkdownReader
+
+def write_note(path, size_mb):
+    """Writes a synthetic lore note of roughly size_mb megabytes."""
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('---\nh1: [Histoire, Culture]\nh2: [Origines]\ntags: [race]\n---\n')
+        group = 0
+        while written < target:
+            block = (f'# Groupe {group}\n'
+                     f'Intro du groupe {group} avec ![[Magie {group % 50}]]\n\n'
+                     f'## Origines {group}\n'
+                     + 'Une longue ligne de lore pour remplir la note. ' * 4 + '\n'
+                     f'### Detail {group}\n'
+                     f'Detail avec ![[Lieu {group % 20}]] et ![[Magie {group % 7}|alias]]\n\n')
+            file.write(block)
+            written += len(block)
+            group += 1
+
+def bench(path, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        MarkdownReader(path, os.path.dirname(path))
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    MarkdownReader(path, os.path.dirname(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4, 8], help='Note sizes in MB')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'size':>6} {'best (s)':>10} {'s/MB':>8} {'peak MB':>9}")
+        for size in args.sizes:
+            path = os.path.join(tmp, f'note_{size}mb.md')
+            write_note(path, size)
+            best, peak = bench(path, args.repeat)
+            print(f"{size:>4}MB {best:>10.3f} {best / size:>8.3f} {peak / 1024 / 1024:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Startup benchmark enforcing a time-to-first-prompt budget.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py --budget-ms 250
+
+It reports the slowest imports of main.py from `python -X importtime`,
+checks that heavy dependencies are not imported by a short session, and
+times how long the interactive prompt takes to appear. The exit status is
+1 when the median time-to-first-prompt exceeds the budget or a heavy
+dependency is loaded at startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic_vault import generate_vault
+
+# Must only be imported on first real use, never by a 'help' session
+HEAVY_MODULES = ['yaml', 'pandas', 'numpy', 'sqlite3', 'asyncio', 'multiprocessing', 'concurrent.futures', 'cProfile']
+
+def import_times(top):
+    """Returns the top (cumulative microseconds, module) imports of main.py."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), module.rstrip()))
+    total = next((cumulative for cumulative, module in rows if module.strip() == 'main'), None)
+    return total, sorted(rows, reverse=True)[:top]
+
+def heavy_imports(vault_path):
+    """Runs a 'help' session in a fresh interpreter and returns the heavy modules it imported."""
+    code = ('import sys, main; main.main(["--vault", sys.argv[1], "--no-server", "help"]); '
+            f'print("HEAVY:" + ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', code, vault_path], cwd=ROOT, capture_output=True, text=True)
+    line = next(line for line in result.stdout.splitlines() if line.startswith('HEAVY:'))
+    return [module for module in line[len('HEAVY:'):].split(',') if module]
+
+def time_to_prompt(vault_path):
+    """Seconds from process start until the interactive prompt is printed."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'main.py'), '--vault', vault_path, '--no-server'],
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    seen = ''
+    while 'VaultManager:' not in seen:
+        char = process.stdout.read(1)
+        if not char:
+            break
+        seen += char
+    elapsed = time.perf_counter() - start
+    process.communicate('exit\n')
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=250.0, help="Maximum median time-to-first-prompt")
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=10, help="Number of slowest imports to show")
+    parser.add_argument('--vault', help="Vault to start on, a small synthetic one by default")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault_path = args.vault
+        if vault_path is None:
+            vault_path = tmp
+            generate_vault(vault_path, races=5)
+
+        total, slowest = import_times(args.top)
+        print(f"import main: {total / 1000:.1f} ms cumulative" if total else "import main: unknown")
+        for cumulative, module in slowest:
+            print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+        heavy = heavy_imports(vault_path)
+        print(f"Heavy modules imported by 'help': {', '.join(heavy) or 'none'}")
+
+        time_to_prompt(vault_path)  # Warm up the .pyc files and the OS caches
+        timings = [time_to_prompt(vault_path) * 1000 for _ in range(args.runs)]
+        median = statistics.median(timings)
+        print(f"Time to first prompt: median {median:.1f} ms, min {min(timings):.1f} ms, budget {args.budget_ms:.0f} ms")
+
+    if heavy or median > args.budget_ms:
+        print("Startup budget exceeded.")
+        sys.exit(1)
+    print("Startup within budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark suite timing the core operations on synthetic vaults of several sizes.
+
+Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --scales small medium --output bench.json
+
+Every operation is timed cold (fresh caches) and, where caching applies,
+warm. Results are written as JSON so runs can be compared over time.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic_vault import generate_vault
+from completion import Completer
+from markdown_reader import MarkdownReader
+from vault_manager import VaultManager
+
+SCALES = {
+    'small': dict(races=5, notes_per_race=4, cities_per_race=6, magics=20, note_size=2048),
+    'medium': dict(races=40, notes_per_race=10, cities_per_race=8, magics=100, note_size=4096),
+    'large': dict(races=200, notes_per_race=20, cities_per_race=10, magics=400, note_size=8192),
+}
+
+def timed(function, repeat=1):
+    """Returns the best wall time of function over repeat runs, with its output silenced."""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def all_notes(vault_path):
+    return [os.path.join(root, file) for root, dirs, files in os.walk(vault_path)
+            for file in files if file.endswith('.md') and '.obsidian_terminal' not in root]
+
+def bench_scale(name, params, repeat):
+    with tempfile.TemporaryDirectory() as vault_path:
+        races = generate_vault(vault_path, **params)
+        notes = all_notes(vault_path)
+        race = races[len(races) // 2]
+        results = {'params': params, 'notes': len(notes),
+                   'bytes': sum(os.path.getsize(note) for note in notes), 'timings': {}}
+        timings = results['timings']
+
+        timings['parse_all'] = timed(lambda: [MarkdownReader(note, vault_path) for note in notes], repeat)
+        timings['parse_front_matter_all'] = timed(
+            lambda: [MarkdownReader(note, vault_path, lazy=True) for note in notes], repeat)
+
+        # Cold start: nothing cached on disk or in memory yet
+        manager = VaultManager(vault_path)
+        timings['open_cold'] = timed(lambda: manager.run_command(f'open {race}'))
+        timings['open_warm'] = timed(lambda: manager.run_command(f'open {race}'), repeat)
+        timings['open_restart'] = timed(lambda: VaultManager(vault_path).run_command(f'open {race}'), repeat)
+
+        timings['report_all_full'] = timed(lambda: manager.issue_reporter.report_all(incremental=False))
+        timings['report_all_incremental'] = timed(lambda: manager.issue_reporter.report_all(), repeat)
+
+        race_file = manager.current_race.file_name
+        timings['city_listing'] = timed(lambda: manager.race_city(race_file), repeat)
+
+        completer = Completer(manager, ['ls', 'cd', 'open'])
+        queries = [('open ', ''), ('open Race00', 'Race00'), ('cd ', ''), ('backlinks ', '')]
+        timings['completion_cold'] = timed(lambda: [completer._compute_matches(*q) for q in queries])
+        timings['completion_warm'] = timed(lambda: [completer._compute_matches(*q) for q in queries], repeat)
+
+        timings['index_build'] = timed(lambda: manager.run_command('backlinks Magie0001'))
+        timings['search_build'] = timed(lambda: manager.run_command('search royaume'))
+        timings['search_query'] = timed(lambda: manager.run_command('search ancien foret'), repeat)
+        timings['graph_build'] = timed(lambda: manager.link_graph.build(), repeat)
+        timings['graph_matrix'] = timed(lambda: manager.link_graph.race_magic_matrix(), repeat)
+        return results
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per warm timing, the best one is kept")
+    parser.add_argument('--output', default='bench_results.json', help="Path of the JSON results")
+    args = parser.parse_args()
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scales': {},
+    }
+    for name in args.scales:
+        print(f"Running '{name}' scale...")
+        report['scales'][name] = result = bench_scale(name, SCALES[name], args.repeat)
+        for operation, seconds in result['timings'].items():
+            print(f"  {operation:<26} {seconds * 1000:>10.1f} ms")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to '{args.output}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Generator for synthetic Obsidian vaults following the real vault layout.
+
+    00 - Races/<Race>/<Race>.md        race note, plus extra notes per race
+    01 - Magies/<Magie>.md             magic notes
+    02 - Lieux/<Race>/<Ville>.md       cities, the first one tagged 'capitale'
+
+Run from the repository root to write a vault to disk:
+
+    python benchmarks/synthetic_vault.py /tmp/vault --races 50 --notes-per-race 10
+"""
+import argparse
+import os
+import random
+
+H1 = ['Histoire', 'Culture', 'Geographie', 'Religion', 'Politique']
+H2 = ['Origines', 'Coutumes', 'Langue', 'Armee', 'Commerce']
+WORDS = ('ancien royaume foret montagne riviere magie feu eau vent terre lumiere ombre '
+         'guerre paix alliance roi reine temple village port desert glace').split()
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def _front_matter(h1=None, h2=None, tags=None):
+    lines = ['---']
+    if h1 is not None:
+        lines.append(f"h1: [{', '.join(h1)}]")
+    if h2 is not None:
+        lines.append(f"h2: [{', '.join(h2)}]")
+    if tags:
+        lines.append(f"tags: [{', '.join(tags)}]")
+    lines.append('---')
+    return '\n'.join(lines) + '\n'
+
+def _body(rng, size_bytes, link_targets, link_density):
+    """Markdown body of roughly size_bytes with '# ', '## ' and '### ' sections."""
+    parts = []
+    written = 0
+    while written < size_bytes:
+        group = rng.choice(H1)
+        block = [f'# {group}']
+        for subgroup in rng.sample(H2, 2):
+            block.append(f'## {subgroup}')
+            for _ in range(3):
+                line = _sentence(rng)
+                if link_targets and rng.random() < link_density:
+                    line += f' ![[{rng.choice(link_targets)}]]'
+                block.append(line)
+            block.append(f'### {_sentence(rng, 2)[:-1]}')
+            block.append(_sentence(rng))
+            block.append('')
+        text = '\n'.join(block) + '\n'
+        parts.append(text)
+        written += len(text)
+    return ''.join(parts)
+
+def generate_vault(path, races=10, notes_per_race=5, cities_per_race=6, magics=30,
+                   note_size=4096, link_density=0.2, seed=0):
+    """Writes a synthetic vault under path and returns the list of race names."""
+    rng = random.Random(seed)
+    race_names = [f'Race{index:04d}' for index in range(races)]
+    magic_names = [f'Magie{index:04d}' for index in range(magics)]
+
+    magic_dir = os.path.join(path, '01 - Magies')
+    os.makedirs(magic_dir, exist_ok=True)
+    for magic in magic_names:
+        with open(os.path.join(magic_dir, f'{magic}.md'), 'w', encoding='utf-8') as file:
+            file.write(_front_matter(tags=['magie']) + _body(rng, note_size // 4, [], 0))
+
+    for race in race_names:
+        race_dir = os.path.join(path, '00 - Races', race)
+        city_dir = os.path.join(path, '02 - Lieux', race)
+        os.makedirs(race_dir, exist_ok=True)
+        os.makedirs(city_dir, exist_ok=True)
+
+        cities = [f'{race}-Ville{index:03d}' for index in range(cities_per_race)]
+        targets = magic_names + cities
+        for index in range(notes_per_race):
+            name = race if index == 0 else f'{race}-Note{index:03d}'
+            # Leave some headers out so the missing header check has findings
+            h1 = rng.sample(H1, rng.randint(2, len(H1)))
+            h2 = rng.sample(H2, rng.randint(1, len(H2)))
+            with open(os.path.join(race_dir, f'{name}.md'), 'w', encoding='utf-8') as file:
+                file.write(_front_matter(h1, h2, ['race']) + _body(rng, note_size, targets, link_density))
+
+        for index, city in enumerate(cities):
+            tags = ['capitale'] if index == 0 else ['ville']
+            with open(os.path.join(city_dir, f'{city}.md'), 'w', encoding='utf-8') as file:
+                file.write(_front_matter(tags=tags) + _body(rng, note_size // 2, [race], link_density))
+
+    return race_names
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Obsidian vault.")
+    parser.add_argument('path')
+    parser.add_argument('--races', type=int, default=10)
+    parser.add_argument('--notes-per-race', type=int, default=5)
+    parser.add_argument('--cities-per-race', type=int, default=6)
+    parser.add_argument('--magics', type=int, default=30)
+    parser.add_argument('--note-size', type=int, default=4096, help="Approximate race note size in bytes")
+    parser.add_argument('--link-density', type=float, default=0.2, help="Probability of a ![[...]] link per line")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    races = generate_vault(args.path, args.races, args.notes_per_race, args.cities_per_race, args.magics,
+                           args.note_size, args.link_density, args.seed)
+    print(f"Generated {len(races)} races in '{args.path}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import readline
+from bisect import bisect_left
+
+RACE_ACTIONS = ['property', 'content', 'links', 'city']
+
+class CompletionIndex:
+    """Sorted, case-insensitive candidate list answering prefix queries in O(log n)."""
+
+    def __init__(self, candidates):
+        pairs = sorted({(candidate.lower(), candidate) for candidate in candidates})
+        self._keys = [key for key, _ in pairs]
+        self._values = [value for _, value in pairs]
+
+    def matches(self, prefix):
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\U0010ffff', start)
+        return self._values[start:end]
+
+    def __contains__(self, name):
+        key = name.lower()
+        position = bisect_left(self._keys, key)
+        return position < len(self._keys) and self._keys[position] == key
+
+class Completer:
+    """Readline completer whose candidates are cached per directory.
+
+    Cached candidates are validated by the mtime of the folders they were
+    listed from, so they follow `cd` and files added or removed in the vault.
+    """
+
+    def __init__(self, vault_manager, commands):
+        self.vault_manager = vault_manager
+        self.commands = CompletionIndex(commands)
+        self.race_actions = CompletionIndex(RACE_ACTIONS)
+        self._cache = {}  # key -> (stamp, cached value)
+        self._matches = []
+
+    def complete(self, text, state):
+        # Readline calls this once per state, only compute the matches once per Tab
+        if state == 0:
+            self._matches = self._compute_matches(readline.get_line_buffer(), text)
+        try:
+            return self._matches[state]
+        except IndexError:
+            return None
+
+    def _compute_matches(self, buffer, text):
+        words = buffer.split()
+
+        # If no text is typed yet
+        if not words:
+            return [cmd + ' ' for cmd in self.commands.matches('')]
+
+        # Autocomplete base commands, and race names for '<race> <action>'
+        if len(words) == 1 and not buffer.endswith(' '):
+            return self.commands.matches(text) + self._race_names().matches(text)
+
+        command = words[0]
+        argument = buffer.split(maxsplit=1)[1] if len(words) > 1 else ''
+        if command == 'cd':
+            index = self._folder_names(self.vault_manager.current_path)
+        elif command in ('open', 'report'):
+            index = self._race_names()
+        elif command == 'backlinks':
+            index = self._note_names()
+        elif len(words) <= 2 and command in self._race_names():
+            index = self.race_actions
+        else:
+            return []
+
+        # Candidates may contain spaces, only return the part readline is replacing
+        offset = len(argument) - len(text)
+        return [match[offset:] for match in index.matches(argument)]
+
+    def _folder_names(self, path):
+        def build():
+            names = ['..'] + [self.vault_manager._clean_folder_name(f.name)
+                              for f in os.scandir(path) if f.is_dir() and not f.name.startswith('.')]
+            return CompletionIndex(names)
+        return self._cached(('folders', path), [path], build)
+
+    def _race_names(self):
+        races_path = os.path.join(self.vault_manager.vault_path, "00 - Races")
+        return self._cached(('races',), [races_path], lambda: CompletionIndex(self._list_races(races_path)))
+
+    def _note_names(self):
+        """Race and city names, for commands taking any note."""
+        races_path = os.path.join(self.vault_manager.vault_path, "00 - Races")
+        cities_path = os.path.join(self.vault_manager.vault_path, "02 - Lieux")
+        city_folders = self._cached(('city folders',), [cities_path],
+                                    lambda: [f.path for f in os.scandir(cities_path) if f.is_dir()]
+                                    if os.path.isdir(cities_path) else [])
+
+        def build():
+            cities = [os.path.splitext(f.name)[0] for folder in city_folders for f in os.scandir(folder)
+                      if f.is_file() and f.name.endswith('.md')]
+            return CompletionIndex(self._list_races(races_path) + cities)
+        return self._cached(('notes',), [races_path, cities_path] + city_folders, build)
+
+    def _list_races(self, races_path):
+        names = []
+        for f in os.scandir(races_path):
+            if f.is_file() and f.name.endswith('.md'):
+                names.append(self.vault_manager._clean_folder_name(f.name[:-3]))
+            elif f.is_dir() and not f.name.startswith('.'):
+                names.append(self.vault_manager._clean_folder_name(f.name))
+        return names
+
+    def _cached(self, key, paths, build):
+        """Returns build(), cached until the mtime of one of paths changes."""
+        try:
+            stamp = tuple(os.stat(path).st_mtime_ns for path in paths)
+        except OSError:
+            stamp = None
+        cached = self._cache.get(key)
+        if cached and stamp is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            value = build()
+        except OSError:
+            value = CompletionIndex([])
+        self._cache[key] = (stamp, value)
+        return value
@@ -0,0 +1,114 @@
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+STATS_ENV = 'OBSIDIAN_TERMINAL_STATS'  # Set to 1 to record statistics from startup
+PROFILE_ENV = 'OBSIDIAN_TERMINAL_PROFILE'  # Set to a folder to dump a cProfile per command
+
+class CommandStats:
+    """Accumulated statistics of one REPL command."""
+    __slots__ = ('calls', 'total_time', 'max_time', 'counters')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.counters = Counter()
+
+class Stats:
+    """Opt-in instrumentation of REPL commands and of the parsing and checking hot paths.
+
+    Counters such as files opened, bytes read, YAML parses and cache hits
+    are only recorded while enabled, so the disabled cost is one attribute
+    check per call site.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get(STATS_ENV, '') not in ('', '0')
+        self.profile_dir = os.environ.get(PROFILE_ENV) or None
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()  # Totals since the last reset
+        self.commands = defaultdict(CommandStats)  # command name -> CommandStats
+        self.last_command = None  # (command, wall time, counters)
+
+    def incr(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    @contextmanager
+    def timer(self, name):
+        """Accumulates the wall time of a block under the 'time.<name>' counter."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.counters[f'time.{name}'] += time.perf_counter() - start
+
+    @contextmanager
+    def command(self, command):
+        """Records the wall time and counters of a REPL command, and profiles it if asked to."""
+        profiler = None
+        if self.profile_dir:
+            import cProfile
+
+            profiler = cProfile.Profile()
+        before = self.counters.copy()
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                self._dump_profile(profiler, command)
+            if self.enabled:
+                elapsed = time.perf_counter() - start
+                delta = self.counters - before
+                entry = self.commands[command.split(maxsplit=1)[0] if command.strip() else '']
+                entry.calls += 1
+                entry.total_time += elapsed
+                entry.max_time = max(entry.max_time, elapsed)
+                entry.counters.update(delta)
+                self.last_command = (command, elapsed, delta)
+
+    def report(self):
+        """Returns the recorded statistics as printable lines."""
+        if not self.enabled:
+            return [f"Statistics are off. Enable them with 'stats on' or {STATS_ENV}=1."]
+
+        lines = ["Commands:"]
+        for name, entry in sorted(self.commands.items(), key=lambda item: -item[1].total_time):
+            lines.append(f"  {name:<12} calls={entry.calls:<5} total={entry.total_time * 1000:.1f}ms "
+                         f"avg={entry.total_time / entry.calls * 1000:.1f}ms max={entry.max_time * 1000:.1f}ms")
+        if self.last_command:
+            command, elapsed, delta = self.last_command
+            lines.append(f"Last command '{command}': {elapsed * 1000:.1f}ms")
+            lines.extend(f"  {line}" for line in self._format_counters(delta))
+        lines.append("Totals:")
+        lines.extend(f"  {line}" for line in self._format_counters(self.counters))
+        return lines
+
+    def _format_counters(self, counters):
+        lines = []
+        for name, value in sorted(counters.items()):
+            if name.startswith('time.'):
+                lines.append(f"{name:<32} {value * 1000:.1f}ms")
+            else:
+                lines.append(f"{name:<32} {value}")
+        return lines or ["(nothing recorded)"]
+
+    def _dump_profile(self, profiler, command):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^\w-]+', '_', command.strip())[:40] or 'empty'
+        path = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns() % 1000000:06d}-{slug}.prof")
+        profiler.dump_stats(path)
+
+stats = Stats()  # Shared by every module of the process
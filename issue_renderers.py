@@ -0,0 +1,70 @@
+import json
+from dataclasses import asdict
+from urllib.parse import quote
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_BASE_ID = 'VAULTROOT'  # Issue paths are relative to the vault
+
+CHECK_DESCRIPTIONS = {
+    'race': "The race folder exists in '00 - Races'.",
+    'missing-headers': "Every note of a race declares the same h1 and h2 headers.",
+    'cities': "A race has a capital and at least five cities in '02 - Lieux'.",
+    'magic-links': "A race note links to at least one note in '01 - Magies'.",
+}
+
+def render_text(issues, races=None):
+    """Human readable report, grouped by race."""
+    if races is None:
+        races = list(dict.fromkeys(issue.race for issue in issues))
+
+    by_race = {race: [] for race in races}
+    for issue in issues:
+        by_race.setdefault(issue.race, []).append(issue)
+
+    lines = []
+    for race, race_issues in by_race.items():
+        lines.append(f"Issues for race '{race}':")
+        if not race_issues:
+            lines.append("  No issues found.")
+        lines.extend(f"  {issue.message}" for issue in race_issues)
+        lines.append('')
+    return '\n'.join(lines)
+
+def render_jsonl(issues, races=None):
+    """One JSON object per issue and per line."""
+    return ''.join(json.dumps(asdict(issue), ensure_ascii=False) + '\n' for issue in issues)
+
+def render_sarif(issues, races=None):
+    """SARIF 2.1.0 log, for code scanning dashboards."""
+    rules = [{'id': check, 'shortDescription': {'text': description}}
+             for check, description in CHECK_DESCRIPTIONS.items()]
+    results = []
+    for issue in issues:
+        result = {
+            'ruleId': issue.check,
+            'level': 'warning',
+            'message': {'text': issue.message},
+            'properties': {'race': issue.race},
+        }
+        if issue.path:
+            # Paths contain spaces and accents, which a URI reference must percent-encode
+            uri = quote(issue.path.replace('\\', '/'))
+            result['locations'] = [{'physicalLocation': {'artifactLocation': {'uri': uri, 'uriBaseId': SARIF_BASE_ID}}}]
+        results.append(result)
+
+    log = {
+        '$schema': SARIF_SCHEMA,
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {'name': 'obsidian_terminal', 'rules': rules}},
+            'originalUriBaseIds': {SARIF_BASE_ID: {'description': {'text': "Root folder of the Obsidian vault."}}},
+            'results': results,
+        }],
+    }
+    return json.dumps(log, ensure_ascii=False, indent=2) + '\n'
+
+RENDERERS = {
+    'text': render_text,
+    'jsonl': render_jsonl,
+    'sarif': render_sarif,
+}
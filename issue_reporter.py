@@ -1,139 +1,330 @@
-import os
-from markdown_reader import MarkdownReader
-import re
-import yaml
-
-class IssueReporter:
-    def __init__(self, vault_path):
-        self.vault_path = vault_path
-
-    def report_issues(self, race_name):
-        print(f"Issues for race '{race_name}':")
-        
-        race_dir = os.path.join(self.vault_path, "00 - Races", race_name)
-        city_dir = os.path.join(self.vault_path, "02 - Lieux", race_name)
-        magic_dir = os.path.join(self.vault_path, "01 - Magies")
-
-        if not os.path.isdir(race_dir):
-            print(f"Race directory '{race_dir}' does not exist.")
-            return
-        
-        all_h1, all_h2 = self.collect_headers(race_dir)
-        self.check_missing_headers(race_dir, all_h1, all_h2)
-        self.check_cities_and_capital(race_name, city_dir)
-        self.check_magic_links(race_name, magic_dir)
-
-    def collect_headers(self, race_dir):
-        """Collects all h1 and h2 headers across all Markdown files in the race directory."""
-        all_h1 = set()
-        all_h2 = set()
-
-        for root, _, files in os.walk(race_dir):
-            for file in files:
-                if file.endswith('.md'):
-                    filepath = os.path.join(root, file)
-                    reader = MarkdownReader(filepath, self.vault_path)
-                    all_h1.update(reader.get_property('h1') or [])
-                    all_h2.update(reader.get_property('h2') or [])
-
-        return all_h1, all_h2
-
-    def check_missing_headers(self, race_dir, all_h1, all_h2):
-        """Checks each file in the race directory for missing h1 and h2 headers."""
-        for root, _, files in os.walk(race_dir):
-            for file in files:
-                if file.endswith('.md'):
-                    filepath = os.path.join(root, file)
-                    reader = MarkdownReader(filepath, self.vault_path)
-                    
-                    file_h1 = set(reader.get_property('h1') or [])
-                    file_h2 = set(reader.get_property('h2') or [])
-
-                    missing_h1 = all_h1 - file_h1
-                    missing_h2 = all_h2 - file_h2
-
-                    if missing_h1:
-                        print(f"  Missing h1 in file '{file}': {missing_h1}")
-                    if missing_h2:
-                        print(f"  Missing h2 in file '{file}': {missing_h2}")
-
-    def check_cities_and_capital(self, race_name, city_dir):
-        """Checks if the race has at least one city, at least one capital, and more than five cities."""
-        if not os.path.exists(city_dir):
-            print(f"  No city directory found for race '{race_name}' in '02 - Lieux'.")
-            return
-        
-        cities = []
-        has_capital = False
-
-        for file in os.listdir(city_dir):
-            if file.endswith('.md'):
-                city_name = os.path.splitext(file)[0]
-                file_path = os.path.join(city_dir, file)
-                tags = self._get_tags_from_file(file_path)
-                
-                cities.append(city_name)
-                if 'capitale' in tags:
-                    has_capital = True
-        
-        if not cities:
-            print(f"  No cities found for race '{race_name}' in '02 - Lieux'.")
-        if not has_capital:
-            print(f"  No capital city found for race '{race_name}' in '02 - Lieux'.")
-        if len(cities) < 5:
-            print(f"  Fewer than 5 cities found for race '{race_name}'. Current count: {len(cities)}")
-
-    def check_magic_links(self, race_name, magic_dir):
-        """Checks if the race file contains links to files in the '01 - Magies' folder."""
-        race_file_path = os.path.join(self.vault_path, "00 - Races", race_name, f"{race_name}.md")
-        
-        if not os.path.isfile(race_file_path):
-            print(f"  Race file '{race_file_path}' not found.")
-            return
-        
-        reader = MarkdownReader(race_file_path, self.vault_path)
-        links = reader.get_links()
-
-        # Debug output for directory path and existence check
-        print(f"Checking magic directory: {magic_dir}")
-        if not os.path.exists(magic_dir):
-            print(f"  Magic directory '{magic_dir}' does not exist.")
-            return
-        
-        if not os.path.isdir(magic_dir):
-            print(f"  Magic directory '{magic_dir}' is not a directory.")
-            return
-
-        # Normalize magic files (remove .md extension, lower case)
-        magic_files = {os.path.splitext(f)[0].lower(): f for f in os.listdir(magic_dir) if f.endswith('.md')}
-        
-        # Debug output for magic files
-        print(f"Magic files found: {list(magic_files.keys())}")
-
-        linked_magics = []
-        
-        # Normalize the links and check against the normalized magic files
-        for group, link_list in links.items():
-            for link in link_list:
-                normalized_link = link.lower().strip()
-                # Debug output for each link
-                print(f"Checking link: '{normalized_link}' against magic files...")
-                if normalized_link in magic_files:
-                    print(f"Link '{normalized_link}' matches a magic file.")
-                    linked_magics.append(normalized_link)
-
-        if not linked_magics:
-            print(f"  No links to magic files found in '{race_name}.md'.")
-        else:
-            # Debug output for linked magic files
-            print(f"Linked magic files found: {linked_magics}")
-
-    def _get_tags_from_file(self, file_path):
-        """Extracts the tags from the front matter of a Markdown file."""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-            if match:
-                front_matter = yaml.safe_load(match.group(1))
-                return front_matter.get('tags', [])
-        return []
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from itertools import repeat
+from instrumentation import stats
+from issue_renderers import RENDERERS
+from note_cache import CACHE_DIR, NoteCache
+from vault_index import LinkResolver
+
+STATE_FILE = 'issue_state.json'
+STATE_VERSION = 3
+
+_worker_resolver = None  # LinkResolver of a worker process, sent once when the pool starts
+
+@dataclass(frozen=True)
+class Issue:
+    """A single finding of an issue check."""
+    race: str
+    check: str  # One of 'race', 'missing-headers', 'cities', 'magic-links'
+    message: str
+    path: str = None  # Vault-relative path of the offending file or folder
+
+def _init_worker(resolver):
+    global _worker_resolver
+    _worker_resolver = resolver
+
+def _report_race(vault_path, race_name, verbosity, stats_enabled):
+    """Audits a single race in a worker process.
+
+    Returns its issues, the counters it recorded and the note cache rows it
+    parsed, which only the parent process writes to disk.
+    """
+    stats.enabled = stats_enabled  # Workers may be spawned without the parent's 'stats on'
+    before = stats.counters.copy()  # Workers are reused across races
+    note_cache = NoteCache(vault_path, read_only=True)
+    issues = IssueReporter(vault_path, note_cache, verbosity).report_issues(race_name, _worker_resolver)
+    note_cache.save()
+    return issues, stats.counters - before, note_cache.exported
+
+class IssueReporter:
+    def __init__(self, vault_path, note_cache=None, verbosity=0, get_resolver=None):
+        self.vault_path = vault_path
+        self.note_cache = note_cache or NoteCache(vault_path)
+        self.verbosity = verbosity  # Debug output goes to stderr when above 0
+        self.get_resolver = get_resolver  # Returns an up-to-date LinkResolver, the vault is walked for one otherwise
+
+    def list_races(self):
+        """Returns the name of every race folder under '00 - Races'."""
+        races_path = os.path.join(self.vault_path, "00 - Races")
+        if not os.path.isdir(races_path):
+            return []
+        return sorted(f.name for f in os.scandir(races_path) if f.is_dir() and not f.name.startswith('.'))
+
+    def report_all(self, max_workers=None, incremental=True):
+        """Audits every race and returns the merged issues."""
+        return self.report_races(self.list_races(), max_workers, incremental)
+
+    def report_races(self, races, max_workers=None, incremental=True):
+        """Audits races and returns the merged issues, in race order.
+
+        Findings of the previous run are reused for races whose input files are
+        unchanged. The remaining races are spread across a process pool when
+        there is more than one of them.
+        """
+        state = self._load_state()
+        with stats.timer('race_inputs'):
+            magic_names = self._listing(os.path.join(self.vault_path, "01 - Magies"))  # Listed once for every race
+            resolver = self._link_resolver() if races else None  # One resolver for the links of every race
+            inputs = {race: self.race_inputs(race, state.get(race), magic_names, resolver) for race in races}
+        stale = [race for race in races
+                 if not incremental or race not in state
+                 or self._fingerprint(state[race]['inputs']) != self._fingerprint(inputs[race])]
+        stats.incr('issue_reporter.rechecked_races', len(stale))
+        stats.incr('issue_reporter.cached_races', len(races) - len(stale))
+
+        results = {}
+        if len(stale) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(resolver,)) as executor:
+                reports = executor.map(_report_race, repeat(self.vault_path), stale, repeat(self.verbosity), repeat(stats.enabled))
+                for race, (issues, counters, rows) in zip(stale, reports):
+                    results[race] = issues
+                    stats.counters.update(counters)  # Count the workers' files read and cache hits too
+                    self.note_cache.import_rows(rows)  # So the next run does not parse the same notes again
+        elif stale:
+            results[stale[0]] = self.report_issues(stale[0], resolver)
+
+        for race in races:
+            if race in results:
+                state[race] = {'inputs': inputs[race], 'issues': [asdict(issue) for issue in results[race]]}
+            else:
+                self._debug(f"Reusing cached findings for race '{race}'.")
+                state[race]['inputs'] = inputs[race]  # Keep refreshed (mtime, size) stamps
+                results[race] = [Issue(**issue) for issue in state[race]['issues']]
+
+        self._save_state(state)
+        return [issue for race in races for issue in results[race]]
+
+    def race_inputs(self, race_name, previous=None, magic_names=None, resolver=None):
+        """Returns the dependencies of a race's findings: its notes, its cities, the magic folder listing
+        and the notes the race file's links resolve to.
+
+        Files are recorded with a content hash, reused from previous when their
+        (mtime, size) did not change. magic_names is the magic folder listing
+        and resolver the LinkResolver, when the caller already has them.
+        """
+        race_dir = os.path.join(self.vault_path, "00 - Races", race_name)
+        city_dir = os.path.join(self.vault_path, "02 - Lieux", race_name)
+        magic_dir = os.path.join(self.vault_path, "01 - Magies")
+        old_files = previous['inputs']['files'] if previous else {}
+
+        paths = [os.path.join(root, file) for root, _, files in os.walk(race_dir) for file in files if file.endswith('.md')]
+        if os.path.isdir(city_dir):
+            paths += [os.path.join(city_dir, file) for file in os.listdir(city_dir) if file.endswith('.md')]
+
+        files = {}
+        for path in paths:
+            rel_path = self._relpath(path)
+            st = os.stat(path)
+            old = old_files.get(rel_path)
+            if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                digest = old[2]
+            else:
+                stats.incr('issue_reporter.hashed_files')
+                digest = self._hash_file(path)
+            files[rel_path] = [st.st_mtime_ns, st.st_size, digest]
+
+        # Only the names matter for these folders, e.g. the magic check never reads magic notes
+        listings = {self._relpath(folder): self._listing(folder) for folder in (race_dir, city_dir)}
+        listings[self._relpath(magic_dir)] = magic_names if magic_names is not None else self._listing(magic_dir)
+
+        # Links resolve anywhere in the vault, e.g. to a magic subfolder or a same-named note elsewhere
+        race_file_path = os.path.join(race_dir, f"{race_name}.md")
+        links = {}
+        if os.path.isfile(race_file_path):
+            resolver = resolver or self._link_resolver()
+            race_path = self._relpath(race_file_path)
+            for link_list in self.note_cache.get(race_file_path).get_links().values():
+                links.update((link, resolver.resolve(link, race_path)) for link in link_list)
+
+        return {'files': files, 'listings': listings, 'links': links}
+
+    def report_issues(self, race_name, resolver=None):
+        """Runs every check for a race and returns the issues found."""
+        race_dir = os.path.join(self.vault_path, "00 - Races", race_name)
+        city_dir = os.path.join(self.vault_path, "02 - Lieux", race_name)
+        magic_dir = os.path.join(self.vault_path, "01 - Magies")
+
+        if not os.path.isdir(race_dir):
+            return [Issue(race_name, 'race', f"Race directory '{race_dir}' does not exist.", self._relpath(race_dir))]
+
+        with stats.timer('check_missing_headers'):
+            all_h1, all_h2 = self.collect_headers(race_dir)
+            issues = self.check_missing_headers(race_name, race_dir, all_h1, all_h2)
+        with stats.timer('check_cities_and_capital'):
+            issues += self.check_cities_and_capital(race_name, city_dir)
+        with stats.timer('check_magic_links'):
+            issues += self.check_magic_links(race_name, magic_dir, resolver)
+        return issues
+
+    def print_report(self, issues, output_format='text', races=None, stream=None):
+        """Renders issues in output_format and writes them in a single write."""
+        (stream or sys.stdout).write(RENDERERS[output_format](issues, races))
+
+    def collect_headers(self, race_dir):
+        """Collects all h1 and h2 headers across all Markdown files in the race directory."""
+        all_h1 = set()
+        all_h2 = set()
+
+        for root, _, files in os.walk(race_dir):
+            for file in files:
+                if file.endswith('.md'):
+                    filepath = os.path.join(root, file)
+                    reader = self.note_cache.get(filepath)
+                    all_h1.update(reader.get_property('h1') or [])
+                    all_h2.update(reader.get_property('h2') or [])
+
+        return all_h1, all_h2
+
+    def check_missing_headers(self, race_name, race_dir, all_h1, all_h2):
+        """Checks each file in the race directory for missing h1 and h2 headers."""
+        issues = []
+        for root, _, files in os.walk(race_dir):
+            for file in files:
+                if file.endswith('.md'):
+                    filepath = os.path.join(root, file)
+                    reader = self.note_cache.get(filepath)
+                    
+                    file_h1 = set(reader.get_property('h1') or [])
+                    file_h2 = set(reader.get_property('h2') or [])
+
+                    missing_h1 = all_h1 - file_h1
+                    missing_h2 = all_h2 - file_h2
+
+                    if missing_h1:
+                        issues.append(Issue(race_name, 'missing-headers', f"Missing h1 in file '{file}': {missing_h1}", self._relpath(filepath)))
+                    if missing_h2:
+                        issues.append(Issue(race_name, 'missing-headers', f"Missing h2 in file '{file}': {missing_h2}", self._relpath(filepath)))
+        return issues
+
+    def check_cities_and_capital(self, race_name, city_dir):
+        """Checks if the race has at least one city, at least one capital, and more than five cities."""
+        if not os.path.exists(city_dir):
+            return [Issue(race_name, 'cities', f"No city directory found for race '{race_name}' in '02 - Lieux'.", self._relpath(city_dir))]
+
+        issues = []
+        cities = []
+        has_capital = False
+
+        for file in os.listdir(city_dir):
+            if file.endswith('.md'):
+                city_name = os.path.splitext(file)[0]
+                file_path = os.path.join(city_dir, file)
+                tags = self._get_tags_from_file(file_path)
+                
+                cities.append(city_name)
+                if 'capitale' in tags:
+                    has_capital = True
+        
+        city_path = self._relpath(city_dir)
+        if not cities:
+            issues.append(Issue(race_name, 'cities', f"No cities found for race '{race_name}' in '02 - Lieux'.", city_path))
+        if not has_capital:
+            issues.append(Issue(race_name, 'cities', f"No capital city found for race '{race_name}' in '02 - Lieux'.", city_path))
+        if len(cities) < 5:
+            issues.append(Issue(race_name, 'cities', f"Fewer than 5 cities found for race '{race_name}'. Current count: {len(cities)}", city_path))
+        return issues
+
+    def check_magic_links(self, race_name, magic_dir, resolver=None):
+        """Checks if the race file contains links resolving to notes in the '01 - Magies' folder."""
+        race_file_path = os.path.join(self.vault_path, "00 - Races", race_name, f"{race_name}.md")
+        
+        race_path = self._relpath(race_file_path)
+        if not os.path.isfile(race_file_path):
+            return [Issue(race_name, 'magic-links', f"Race file '{race_file_path}' not found.", race_path)]
+
+        reader = self.note_cache.get(race_file_path)
+        links = reader.get_links()
+
+        self._debug(f"Checking magic directory: {magic_dir}")
+        if not os.path.exists(magic_dir):
+            return [Issue(race_name, 'magic-links', f"Magic directory '{magic_dir}' does not exist.", self._relpath(magic_dir))]
+
+        if not os.path.isdir(magic_dir):
+            return [Issue(race_name, 'magic-links', f"Magic directory '{magic_dir}' is not a directory.", self._relpath(magic_dir))]
+
+        # Resolve the links like Obsidian and the vault index do, instead of listing the magic folder again
+        resolver = resolver or self._link_resolver()
+        magic_prefix = self._relpath(magic_dir) + os.sep
+        linked_magics = []
+
+        for group, link_list in links.items():
+            for link in link_list:
+                target = resolver.resolve(link, race_path)
+                self._debug(f"Link '{link}' resolves to {target!r}.")
+                if target and target.startswith(magic_prefix) and target.endswith('.md'):
+                    linked_magics.append(target)
+
+        if not linked_magics:
+            return [Issue(race_name, 'magic-links', f"No links to magic files found in '{race_name}.md'.", race_path)]
+        self._debug(f"Linked magic files found: {linked_magics}")
+        return []
+
+    def _link_resolver(self):
+        return self.get_resolver() if self.get_resolver else LinkResolver.scan(self.vault_path)
+
+    def _listing(self, folder):
+        return sorted(f for f in os.listdir(folder) if f.endswith('.md')) if os.path.isdir(folder) else None
+
+    def _get_tags_from_file(self, file_path):
+        """Extracts the tags from the front matter of a Markdown file."""
+        return self.note_cache.get(file_path).get_property('tags') or []
+
+    def _fingerprint(self, inputs):
+        return {path: record[2] for path, record in inputs['files'].items()}, inputs['listings'], inputs['links']
+
+    def _hash_file(self, path):
+        import hashlib
+
+        with open(path, 'rb') as file:
+            return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
+    def _state_path(self):
+        return os.path.join(self.vault_path, CACHE_DIR, STATE_FILE)
+
+    def _load_state(self):
+        try:
+            with open(self._state_path(), 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return data['races'] if data.get('version') == STATE_VERSION else {}
+
+    def _save_state(self, state):
+        try:
+            os.makedirs(os.path.join(self.vault_path, CACHE_DIR), exist_ok=True)
+            with open(self._state_path(), 'w', encoding='utf-8') as file:
+                json.dump({'version': STATE_VERSION, 'races': state}, file, ensure_ascii=False, separators=(',', ':'))
+        except OSError as e:
+            print(f"Could not save the issue report state: {e}", file=sys.stderr)
+
+    def _debug(self, message):
+        if self.verbosity > 0:
+            print(message, file=sys.stderr)
+
+    def _relpath(self, path):
+        return os.path.relpath(path, self.vault_path)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report issues for the races of an Obsidian vault.")
+    parser.add_argument('--vault', default='Gladion Vault', help="Path to the vault")
+    parser.add_argument('--race', help="Only report this race instead of every race")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    parser.add_argument('--format', choices=sorted(RENDERERS), default='text', help="Output format")
+    parser.add_argument('--full', action='store_true', help="Re-check every race instead of only the changed ones")
+    parser.add_argument('-v', '--verbose', action='count', default=0, help="Print debug output to stderr")
+    args = parser.parse_args()
+
+    reporter = IssueReporter(args.vault, verbosity=args.verbose)
+    races = [args.race] if args.race else reporter.list_races()
+    issues = reporter.report_races(races, args.workers, incremental=not args.full)
+    reporter.print_report(issues, args.format, races)
+    reporter.note_cache.save()
+
+if __name__ == "__main__":
+    main()
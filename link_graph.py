@@ -0,0 +1,97 @@
+import os
+from note_cache import NoteCache
+from vault_index import VaultIndex
+
+RACES_DIR = "00 - Races"
+MAGIC_DIR = "01 - Magies"
+
+class LinkGraph:
+    """Analytics over the ![[...]] embeds of every note of the vault.
+
+    The graph comes from the links stored in the VaultIndex, resolved once
+    by its LinkResolver, so building it never re-reads an unchanged note and
+    agrees with 'backlinks' on every embed.
+    """
+
+    def __init__(self, vault_index):
+        self.vault_index = vault_index
+        self.notes = []  # Relative paths of the Markdown notes
+        self.edges = {}  # note -> resolved relative paths it embeds
+        self.broken = []  # (note, link) embeds resolving to nothing
+        self.incoming = {}  # relative path -> notes embedding it
+
+    def build(self, files=None):
+        """Resolves every embed of every note, from the index; files is a scan_vault result to load it from."""
+        self.vault_index.ensure_loaded(files)
+        self.edges, self.broken, self.incoming = self.vault_index.resolved_links()
+        self.notes = sorted(self.vault_index.notes)
+        return self
+
+    def orphans(self):
+        """Notes without any embed, neither to nor from another note."""
+        return [note for note in self.notes if not self.edges.get(note) and note not in self.incoming]
+
+    def unused_magics(self):
+        """Magic notes that no note embeds."""
+        return [note for note in self.notes if self._in_folder(note, MAGIC_DIR) and note not in self.incoming]
+
+    def race_magic_matrix(self):
+        """Returns a races x magics DataFrame counting, for each race, its notes embedding each magic."""
+        import pandas as pd  # Deferred, only the matrix needs pandas
+
+        races, magics = [], []
+        for note, targets in self.edges.items():
+            race = self._race_of(note)
+            if race is None:
+                continue
+            for target in targets:
+                if self._in_folder(target, MAGIC_DIR) and target.endswith('.md'):
+                    races.append(race)
+                    magics.append(self._name(target))
+
+        all_races = sorted({race for race in map(self._race_of, self.notes) if race is not None})
+        all_magics = sorted(self._name(note) for note in self.notes if self._in_folder(note, MAGIC_DIR))
+        matrix = pd.crosstab(pd.Series(races, name='race', dtype=object), pd.Series(magics, name='magic', dtype=object))
+        return matrix.reindex(index=all_races, columns=all_magics, fill_value=0).rename_axis(index='race', columns='magic')
+
+    def _race_of(self, note):
+        # Races are either a folder '00 - Races/<race>/...' or a single note '00 - Races/<race>.md'
+        parts = note.split(os.sep)
+        if parts[0] != RACES_DIR or len(parts) < 2:
+            return None
+        return parts[1] if len(parts) > 2 else self._name(note)
+
+    def _in_folder(self, rel_path, folder):
+        return rel_path.startswith(folder + os.sep)
+
+    def _name(self, rel_path):
+        return os.path.splitext(os.path.basename(rel_path))[0]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report broken embeds, orphan notes and unused magics of an Obsidian vault.")
+    parser.add_argument('--vault', default='Gladion Vault', help="Path to the vault")
+    parser.add_argument('--csv', help="Write the race x magic matrix to this CSV file")
+    args = parser.parse_args()
+
+    note_cache = NoteCache(args.vault)
+    vault_index = VaultIndex(args.vault, note_cache)
+    graph = LinkGraph(vault_index).build()
+    print(f"Broken embeds: {len(graph.broken)}")
+    for note, link in graph.broken:
+        print(f"  {note}: ![[{link}]]")
+    print(f"Orphan notes: {len(graph.orphans())}")
+    for note in graph.orphans():
+        print(f"  {note}")
+    print(f"Unused magics: {len(graph.unused_magics())}")
+    for note in graph.unused_magics():
+        print(f"  {note}")
+    if args.csv:
+        graph.race_magic_matrix().to_csv(args.csv)
+        print(f"Race x magic matrix written to '{args.csv}'.")
+    vault_index.save()
+    note_cache.save()
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,100 @@
-from vault_manager import VaultManager
-import readline
-import os
-
-vault_path = 'Gladion Vault'
-vault_manager = VaultManager(vault_path)
-
-BASE_COMMANDS = ['ls', 'cd', 'open', 'close', 'property', 'content', 'links', 'city', 'help', 'exit']                 
- 
-def completer(text, state):
-    buffer = readline.get_line_buffer()
-    line = buffer.split()
-
-    # If no text is typed yet
-    if not line:
-        return [cmd + ' ' for cmd in BASE_COMMANDS][state]
-
-    # Autocomplete base commands
-    if len(line) == 1:
-        matches = [cmd for cmd in BASE_COMMANDS if cmd.startswith(text)]
-    else:
-        # Handle subcommands like 'cd' and 'race'
-        if line[0] == 'cd':
-            path = line[1] if len(line) > 1 else ''
-            matches = [d + '/' for d in os.listdir(vault_manager.current_path) if d.startswith(path)]
-        elif line[0] == 'open' and len(line) == 2:
-            race_path = os.path.join(vault_path, "00 - Races")
-            matches = [f[:-3] for f in os.listdir(race_path) if f.lower().startswith(line[1].lower()) and f.endswith('.md')]
-        else:
-            matches = []
-
-    try:
-        return matches[state]
-    except IndexError:
-        return None
-    
-readline.set_completer(completer)
-readline.parse_and_bind('tab: complete')
-
-def main():
-    while True:
-        if vault_manager.current_race:
-            race_name = os.path.splitext(vault_manager.current_race.file_name)[0]
-            command = input(f"\nVaultManager [{race_name}]: ").strip().lower()
-        else:
-            command = input("\nVaultManager: ").strip().lower()
-        
-        if command == 'exit':
-            print("Exiting the program.")
-            break
-        else:
-            print(f"\n")
-            vault_manager.run_command(command)
-
-if __name__ == "__main__":
-    main()
+from vault_manager import VaultManager
+from vault_server import VaultClient, VaultServer
+import argparse
+import io
+import os
+import sys
+
+DEFAULT_VAULT = 'Gladion Vault'
+
+BASE_COMMANDS = ['ls', 'cd', 'open', 'close', 'report', 'property', 'content', 'links', 'city', 'backlinks', 'tagged', 'where', 'search', 'graph', 'stats', 'help', 'exit']
+
+def setup_readline(vault_manager):
+    # Only the interactive prompt needs readline
+    import readline
+    from completion import Completer
+
+    completer = Completer(vault_manager, BASE_COMMANDS)  # Candidates are cached per directory
+    readline.set_completer(completer.complete)
+    readline.parse_and_bind('tab: complete')
+
+def split_commands(text):
+    """Splits a script into commands separated by newlines or ';', skipping '#' comment lines."""
+    commands = []
+    for line in text.splitlines():
+        if not line.strip().startswith('#'):
+            commands.extend(command.strip() for command in line.split(';') if command.strip())
+    return commands
+
+def run_batch(vault_manager, commands, stream=None):
+    """Runs commands in order against one warm VaultManager and writes their output in a single write."""
+    buffer = io.StringIO()
+    try:
+        for command in commands:
+            command = command.strip()
+            if command.lower() == 'exit':
+                break
+            try:
+                vault_manager.run_command(command, buffer)
+            except ConnectionError:
+                raise  # The server is gone, the next commands would fail too
+            except Exception as e:
+                # Report the failing command and keep going with the next ones
+                print(f"Error in command '{command}': {e}", file=buffer)
+    finally:
+        (stream or sys.stdout).write(buffer.getvalue())
+
+def interactive(vault_manager):
+    setup_readline(vault_manager)
+    vault_manager.start_watcher()
+    while True:
+        try:
+            if vault_manager.race_name:
+                command = input(f"\nVaultManager [{vault_manager.race_name}]: ").strip()
+            else:
+                command = input("\nVaultManager: ").strip()
+        except EOFError:
+            command = 'exit'
+
+        if command.lower() == 'exit':
+            print("Exiting the program.")
+            break
+        elif command:
+            print(f"\n")
+            vault_manager.run_command(command)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Browse and audit an Obsidian vault from the terminal.")
+    parser.add_argument('--vault', default=DEFAULT_VAULT, help="Path to the vault")
+    parser.add_argument('-f', '--file', help="Run the commands of a script file ('-' for stdin), then exit")
+    parser.add_argument('commands', nargs='*', help="Commands to run, separated by ';', then exit")
+    parser.add_argument('--serve', action='store_true', help="Keep the vault warm in memory and serve clients over a Unix socket")
+    parser.add_argument('--no-server', action='store_true', help="Do not use a running server, load the vault in this process")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        vault_manager = VaultManager(os.path.abspath(args.vault))
+        vault_manager.start_watcher()
+        VaultServer(vault_manager).serve_forever()
+        return
+
+    # Use the warm vault of a running server when there is one
+    vault_manager = None if args.no_server else VaultClient.connect(args.vault)
+    if vault_manager is None:
+        vault_manager = VaultManager(args.vault)
+    if not (args.file or args.commands):
+        interactive(vault_manager)
+        return
+
+    commands = []
+    if args.file == '-':
+        commands += split_commands(sys.stdin.read())
+    elif args.file:
+        with open(args.file, 'r', encoding='utf-8') as file:
+            commands += split_commands(file.read())
+    for arg in args.commands:
+        commands += split_commands(arg)  # Each argument is its own command, or ';'-separated commands
+    run_batch(vault_manager, commands)
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,258 @@
-import os
-import re
-import yaml
-from collections import defaultdict
-
-class MarkdownReader:
-    def __init__(self, filepath, vault_path):
-        self.content = defaultdict(lambda: defaultdict(list))  # Hierarchical content structure
-        self.property = {}
-        self.links = {}  # To store "from -> [to]" links
-        self.file_name = os.path.basename(filepath)
-        self.base_path = vault_path  # Base path for resolving embeds
-        self._parse_file(filepath)
-
-    def _parse_file(self, filepath):
-        with open(filepath, 'r', encoding='utf-8') as file:
-            data = file.read()
-
-        # Split the file into parts: properties (YAML front matter) and the rest
-        match = re.match(r'---\n(.*?)\n---\n(.*)', data, re.DOTALL)
-        if match:
-            yaml_content = match.group(1)
-            markdown_content = match.group(2)
-
-            # Parse the YAML front matter into self.property
-            self.property = yaml.safe_load(yaml_content)
-
-            # Parse the Markdown content into self.content and self.links
-            self._parse_markdown_content(markdown_content)
-        else:
-            # No YAML front matter found, just parse the Markdown content
-            self._parse_markdown_content(data)
-
-    def _parse_markdown_content(self, content):
-        current_group = None
-        current_subgroup = None
-
-        for line in content.splitlines():
-            if line.startswith('# '):
-                current_group = line.strip().lstrip('#').strip()
-                self.content[current_group] = defaultdict(list)
-                current_subgroup = None  # Reset subgroup when a new group is found
-
-            elif line.startswith('## '):
-                current_subgroup = line.strip().lstrip('#').strip()
-                self.content[current_group][current_subgroup] = []
-
-            elif line.startswith('### '):
-                current_subsubgroup = line.strip().lstrip('#').strip()
-                if current_subgroup:
-                    self.content[current_group][current_subgroup].append((current_subsubgroup, []))
-                else:
-                    # If there's no subgroup, treat it as part of the group
-                    self.content[current_group][current_subsubgroup] = []
-
-            elif line.strip():  # Only add non-empty lines
-                # Extract links of the form ![[link]]
-                links = re.findall(r'!\[\[(.*?)\]\]', line)
-                if links:
-                    for link in links:
-                        self.links[current_group] = self.links.get(current_group, []) + [link]
-                
-                # Add the line to the appropriate group/subgroup
-                if current_subgroup:
-                    if isinstance(self.content[current_group][current_subgroup], list):
-                        self.content[current_group][current_subgroup].append(line)
-                    else:
-                        self.content[current_group][current_subgroup][-1][1].append(line)
-                elif current_group:
-                    # Instead of using '_content', assign directly to the group name
-                    self.content[current_group][current_group] = self.content[current_group].get(current_group, []) + [line]
-
-    def get_property(self, key):
-        return self.property.get(key)
-
-    def get_group_titles(self):
-        return list(self.content.keys())
-
-    def get_subgroup_titles(self, group_title):
-        return list(self.content[group_title].keys()) if group_title in self.content else []
-
-    def get_content(self, group_title, subgroup_title=None):
-        if subgroup_title:
-            return self.content[group_title][subgroup_title]
-        return self.content[group_title]
-
-    def get_links(self):
-        return self.links
+import os
+import re
+import sys
+from array import array
+from instrumentation import stats
+
+FRONT_MATTER_DELIMITER = '---\n'
+LINK_PATTERN = re.compile(r'!\[\[(.*?)\]\]')
+
+class Section:
+    """Lines of a group or subgroup, stored as (offset, length) spans into the note's text buffer.
+
+    Consecutive lines share a span, so a section usually costs a couple of
+    integers instead of one string object per line.
+    """
+    __slots__ = ('spans',)
+
+    def __init__(self):
+        self.spans = array('l')  # Flat offset, length pairs
+
+    @classmethod
+    def from_spans(cls, spans):
+        section = cls()
+        section.spans.extend(spans)
+        return section
+
+    def add_run(self, offset, length):
+        self.spans.append(offset)
+        self.spans.append(length)
+
+    def lines(self, text):
+        """Materializes the section as the non-empty lines, '###' headers as (title, []) tuples."""
+        items = []
+        spans = self.spans
+        for index in range(0, len(spans), 2):
+            offset = spans[index]
+            for line in text[offset:offset + spans[index + 1]].split('\n'):
+                if line.startswith('### '):
+                    items.append((line.strip().lstrip('#').strip(), []))
+                elif line.strip():
+                    items.append(line)
+        return items
+
+class MarkdownReader:
+    __slots__ = ('property', 'filepath', 'file_name', 'base_path', '_text', '_content', '_preamble', '_links', '_body_loaded')
+
+    def __init__(self, filepath, vault_path, lazy=False):
+        self._text = ''  # Body of the note, shared by every Section
+        self._content = {}  # group -> subgroup -> Section
+        self._preamble = Section()  # Lines outside any group, e.g. before the first header
+        self.property = {}
+        self._links = {}  # To store "from -> [to]" links
+        self.filepath = filepath
+        self.file_name = os.path.basename(filepath)
+        self.base_path = vault_path  # Base path for resolving embeds
+        self._body_loaded = False
+        # In lazy mode only the front matter is read, the body is parsed on first access
+        self._parse_file(filepath, parse_body=not lazy)
+
+    @classmethod
+    def from_record(cls, filepath, vault_path, record):
+        """Rebuilds a reader from the plain data of to_record, without reading the file."""
+        reader = cls.__new__(cls)
+        reader.filepath = filepath
+        reader.file_name = os.path.basename(filepath)
+        reader.base_path = vault_path
+        reader.property = reader._intern_property(record['property'])
+        reader._text = record['text']
+        reader._content = {sys.intern(group) if group else group: {sys.intern(subgroup): Section.from_spans(spans)
+                                                                   for subgroup, spans in subgroups}
+                           for group, subgroups in record['content']}
+        reader._preamble = Section.from_spans(record['preamble'])
+        reader._links = {group: links for group, links in record['links']}
+        reader._body_loaded = record['body_loaded']
+        return reader
+
+    def to_record(self):
+        """Plain data (dicts, lists, strings and numbers) describing the reader, see from_record."""
+        return {
+            'property': self.property,
+            'body_loaded': self._body_loaded,
+            'text': self._text,
+            # Pairs rather than dicts, group titles may be None
+            'content': [[group, [[subgroup, section.spans.tolist()] for subgroup, section in subgroups.items()]]
+                        for group, subgroups in self._content.items()],
+            'preamble': self._preamble.spans.tolist(),
+            'links': [[group, links] for group, links in self._links.items()],
+        }
+
+    @property
+    def content(self):
+        """Hierarchical content, materialized as {group: {subgroup: [lines]}}."""
+        self._load_body()
+        return {group: {subgroup: section.lines(self._text) for subgroup, section in subgroups.items()}
+                for group, subgroups in self._content.items()}
+
+    @property
+    def links(self):
+        self._load_body()
+        return self._links
+
+    @property
+    def body_loaded(self):
+        return self._body_loaded
+
+    def _parse_file(self, filepath, parse_body=True):
+        stats.incr('files_opened')
+        with open(filepath, 'r', encoding='utf-8') as file:
+            body_start = self._read_front_matter(file)
+            if parse_body:
+                stats.incr('body_parses')
+                self._parse_markdown_content(body_start + file.read())
+                self._body_loaded = True
+            stats.incr('bytes_read', file.buffer.tell())
+
+    def _load_body(self):
+        if self._body_loaded:
+            return
+        stats.incr('files_opened')
+        stats.incr('body_parses')
+        with open(self.filepath, 'r', encoding='utf-8') as file:
+            body_start = self._read_front_matter(file, parse_yaml=False)
+            body = body_start + file.read()
+            stats.incr('bytes_read', file.buffer.tell())
+        self._parse_markdown_content(body)
+        # Only once parsed, so a failed read raises again on the next access instead of looking empty
+        self._body_loaded = True
+
+    def _read_front_matter(self, file, parse_yaml=True):
+        """Reads the YAML front matter up to the closing '---'.
+
+        Returns the text already consumed that belongs to the body; the rest
+        of the body is still unread in file.
+        """
+        first_line = file.readline()
+        if first_line != FRONT_MATTER_DELIMITER:
+            return first_line
+
+        yaml_lines = []
+        for line in file:
+            if line == FRONT_MATTER_DELIMITER:
+                if parse_yaml:
+                    import yaml  # Deferred, importing yaml dominates startup
+
+                    stats.incr('yaml_parses')
+                    self.property = self._intern_property(yaml.safe_load(''.join(yaml_lines)) or {})
+                return ''
+            yaml_lines.append(line)
+
+        # No closing delimiter found, just parse everything as Markdown content
+        return first_line + ''.join(yaml_lines)
+
+    def _intern_property(self, front_matter):
+        # Headers and tags repeat across the whole vault, share one string object for each
+        if not isinstance(front_matter, dict):
+            return front_matter
+        for key in ('h1', 'h2', 'tags'):
+            value = front_matter.get(key)
+            if isinstance(value, list):
+                front_matter[key] = [sys.intern(v) if isinstance(v, str) else v for v in value]
+        return front_matter
+
+    def _parse_markdown_content(self, text):
+        """Parses the note body into Sections over a single text buffer, and self.links, in a single pass."""
+        self._text = text
+        content = self._content
+        links = self._links
+        current_group = None
+        current_subgroup = None
+        run_section = None  # Section receiving the current run of lines
+        run_start = run_end = 0
+
+        position = 0
+        length = len(text)
+        while position < length:
+            line_end = text.find('\n', position)
+            if line_end == -1:
+                line_end = length
+            line = text[position:line_end]
+
+            if line.startswith('# '):
+                current_group = sys.intern(line.strip().lstrip('#').strip())
+                content[current_group] = {}
+                current_subgroup = None  # Reset subgroup when a new group is found
+                run_section = self._close_run(run_section, run_start, run_end)
+
+            elif line.startswith('## '):
+                current_subgroup = sys.intern(line.strip().lstrip('#').strip())
+                content.setdefault(current_group, {})[current_subgroup] = Section()
+                run_section = self._close_run(run_section, run_start, run_end)
+
+            elif line.startswith('### ') and not current_subgroup:
+                # If there's no subgroup, treat it as part of the group
+                current_subsubgroup = sys.intern(line.strip().lstrip('#').strip())
+                content.setdefault(current_group, {})[current_subsubgroup] = Section()
+                run_section = self._close_run(run_section, run_start, run_end)
+
+            elif line.strip():  # Only add non-empty lines
+                # Extract links of the form ![[link]], skipping the regex on lines without any.
+                # '###' lines only get here under a subgroup, where their links were never collected
+                if '![[' in line and not line.startswith('### '):
+                    found = LINK_PATTERN.findall(line)
+                    if found:
+                        links.setdefault(current_group, []).extend(found)
+
+                # Add the line to the appropriate group/subgroup; '###' lines under a subgroup stay in its run
+                if current_subgroup:
+                    section = content[current_group][current_subgroup]
+                elif current_group:
+                    # Instead of using '_content', assign directly to the group name
+                    section = content[current_group].get(current_group)
+                    if section is None:
+                        section = content[current_group][current_group] = Section()
+                else:
+                    section = self._preamble  # Not part of content, but still searchable
+
+                if section is not None and section is run_section:
+                    run_end = line_end  # Extend the run, over any blank lines in between
+                else:
+                    self._close_run(run_section, run_start, run_end)
+                    run_section, run_start, run_end = section, position, line_end
+
+            position = line_end + 1
+
+        self._close_run(run_section, run_start, run_end)
+
+    def _close_run(self, section, start, end):
+        if section is not None:
+            section.add_run(start, end - start)
+        return None
+
+    def get_property(self, key):
+        return self.property.get(key)
+
+    def get_preamble(self):
+        """Lines outside any group, which content leaves out."""
+        self._load_body()
+        return self._preamble.lines(self._text)
+
+    def get_group_titles(self):
+        self._load_body()
+        return list(self._content.keys())
+
+    def get_subgroup_titles(self, group_title):
+        self._load_body()
+        return list(self._content[group_title].keys()) if group_title in self._content else []
+
+    def get_content(self, group_title, subgroup_title=None):
+        """Materializes only the requested group, or subgroup, from the text buffer."""
+        self._load_body()
+        subgroups = self._content.get(group_title, {})
+        if subgroup_title:
+            section = subgroups.get(subgroup_title)
+            return section.lines(self._text) if section else []
+        return {subgroup: section.lines(self._text) for subgroup, section in subgroups.items()}
+
+    def get_links(self):
+        return self.links
@@ -0,0 +1,195 @@
+import datetime
+import json
+import os
+from collections import OrderedDict
+from instrumentation import stats
+from markdown_reader import MarkdownReader
+
+CACHE_DIR = '.obsidian_terminal'
+CACHE_FILE = 'note_cache.sqlite'
+CACHE_VERSION = 6  # Bump when the MarkdownReader record layout changes
+
+def open_cache_db(vault_path, file_name, version, tables):
+    """Connects to an SQLite file of the cache directory, dropping tables written by another version."""
+    import sqlite3
+
+    cache_dir = os.path.join(vault_path, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Callers serialize access, the vault watcher thread may use the connection too
+    db = sqlite3.connect(os.path.join(cache_dir, file_name), check_same_thread=False)
+    if db.execute('PRAGMA user_version').fetchone()[0] != version:
+        for table in tables:
+            db.execute(f'DROP TABLE IF EXISTS {table}')
+        db.execute(f'PRAGMA user_version = {version}')
+    return db
+
+def _encode_value(value):
+    # YAML front matter may hold dates, the only values JSON has no type for that we keep
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$date': value.isoformat()}
+    raise TypeError(f"Cannot store {type(value).__name__} in the note cache")
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        if '$datetime' in obj:
+            return datetime.datetime.fromisoformat(obj['$datetime'])
+        if '$date' in obj:
+            return datetime.date.fromisoformat(obj['$date'])
+    return obj
+
+def dump_reader(reader):
+    """Serializes a reader as JSON, or returns None when its front matter would not load back identical."""
+    try:
+        front_matter = json.dumps(reader.property, default=_encode_value)
+        if json.loads(front_matter, object_hook=_decode_object) != reader.property:
+            return None  # e.g. non-string keys or sets, parse such notes again instead
+        return json.dumps(reader.to_record(), default=_encode_value, ensure_ascii=False, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+
+def load_reader(path, vault_path, data):
+    """Rebuilds a reader from dump_reader's JSON. Plain data only, the cache file lives in a possibly shared vault."""
+    return MarkdownReader.from_record(path, vault_path, json.loads(data, object_hook=_decode_object))
+
+class NoteCache:
+    """Vault-wide cache of parsed notes, with an in-memory LRU tier and an on-disk SQLite tier.
+
+    Entries are keyed by absolute path and validated by (mtime, size), so each
+    note is parsed at most once per change, including across process restarts.
+    Notes are loaded front matter first; the body is parsed on first access.
+    """
+
+    def __init__(self, vault_path, max_entries=512, persist=True, read_only=False):
+        self.vault_path = vault_path
+        self.max_entries = max_entries
+        self.read_only = read_only  # Read the disk tier but never write it, e.g. from worker processes
+        self.exported = []  # Rows saved by a read-only cache, (path, mtime_ns, size, data)
+        self._imported = []  # Rows from read-only caches, written on the next save
+        self._memory = OrderedDict()  # path -> (stamp, reader), most recently used last
+        self._pending = {}  # path -> (stamp, reader) not yet written to disk
+        self._partial = {}  # path -> (stamp, reader) stored on disk without their body
+        self.persist = persist
+        self._db = None  # Opened on first use, so startup never pays for it
+        self._db_opened = False
+
+    def _database(self):
+        if self.persist and not self._db_opened:
+            self._db_opened = True
+            self._db = self._open_db()
+        return self._db
+
+    def _open_db(self):
+        import sqlite3
+
+        try:
+            db = open_cache_db(self.vault_path, CACHE_FILE, CACHE_VERSION, ['notes'])
+            db.execute('CREATE TABLE IF NOT EXISTS notes ('
+                       'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, data TEXT)')
+            db.commit()
+            return db
+        except (OSError, sqlite3.Error) as e:
+            # A read-only or broken vault still works, just without the disk tier
+            print(f"Note cache disabled on disk: {e}")
+            return None
+
+    def get(self, filepath):
+        """Returns the MarkdownReader for filepath, parsing it only if it changed."""
+        path = os.path.abspath(filepath)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        entry = self._memory.get(path)
+        if entry and entry[0] == stamp:
+            stats.incr('note_cache.memory_hits')
+            self._memory.move_to_end(path)
+            return entry[1]
+
+        reader = self._load_from_disk(path, stamp)
+        if reader is None:
+            stats.incr('note_cache.misses')
+            reader = MarkdownReader(path, self.vault_path, lazy=True)
+            self._pending[path] = (stamp, reader)
+        else:
+            stats.incr('note_cache.disk_hits')
+            if not reader.body_loaded:
+                self._partial[path] = (stamp, reader)
+        self._remember(path, stamp, reader)
+        if len(self._pending) >= self.max_entries:
+            # Whole-vault passes would otherwise hold every parsed note until the final save
+            self.save()
+        return reader
+
+    def invalidate(self, filepath):
+        """Drops filepath from every tier, e.g. after it was deleted."""
+        path = os.path.abspath(filepath)
+        self._memory.pop(path, None)
+        self._pending.pop(path, None)
+        self._partial.pop(path, None)
+        if self._database() is not None and not self.read_only:
+            self._db.execute('DELETE FROM notes WHERE path = ?', (path,))
+
+    def save(self):
+        """Writes newly parsed notes, and bodies parsed since the last save, to the disk tier.
+
+        A read-only cache appends them to exported instead, for the process
+        owning the disk tier to store with import_rows.
+        """
+        if not (self._pending or self._imported or self._db_opened):
+            return  # Nothing was parsed or read from disk yet
+        if self.read_only:
+            self.exported += self._take_rows()
+            return
+        if self._database() is None:
+            self._pending.clear()
+            self._imported.clear()
+            return
+
+        rows = self._imported + self._take_rows()
+        self._imported = []
+        if rows:
+            self._db.executemany('INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?)', rows)
+        self._db.commit()
+
+    def import_rows(self, rows):
+        """Queues rows exported by a read-only cache, e.g. a worker process, for the next save."""
+        self._imported += rows
+        if len(self._imported) >= self.max_entries:
+            self.save()
+
+    def _take_rows(self):
+        # Stored notes whose body got parsed in the meantime are written again, complete
+        entries = dict(self._pending)
+        for path, (stamp, reader) in list(self._partial.items()):
+            if reader.body_loaded:
+                entries[path] = (stamp, reader)
+                del self._partial[path]
+        for path, (stamp, reader) in self._pending.items():
+            # Only readers still held in memory can get their body parsed later
+            if not reader.body_loaded and path in self._memory:
+                self._partial[path] = (stamp, reader)
+        self._pending.clear()
+        return [(path, stamp[0], stamp[1], data) for path, (stamp, reader) in entries.items()
+                if (data := dump_reader(reader)) is not None]
+
+    def _load_from_disk(self, path, stamp):
+        if self._database() is None:
+            return None
+        row = self._db.execute('SELECT mtime_ns, size, data FROM notes WHERE path = ?', (path,)).fetchone()
+        if row is None or (row[0], row[1]) != stamp:
+            return None
+        try:
+            return load_reader(path, self.vault_path, row[2])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            # Entry damaged or written by an incompatible version, parse the file again
+            return None
+
+    def _remember(self, path, stamp, reader):
+        self._memory[path] = (stamp, reader)
+        self._memory.move_to_end(path)
+        while len(self._memory) > self.max_entries:
+            evicted, (evicted_stamp, evicted_reader) = self._memory.popitem(last=False)
+            # _partial must not outlive the LRU tier, write a body parsed meanwhile on the next save
+            if self._partial.pop(evicted, None) and evicted_reader.body_loaded:
+                self._pending[evicted] = (evicted_stamp, evicted_reader)
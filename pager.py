@@ -0,0 +1,41 @@
+import itertools
+import shlex
+
+PAGE_SIZE = 100  # Lines shown by default, the rest is reached with --offset
+
+def parse_page_args(args):
+    """Splits '--limit N' and '--offset N' out of a command's arguments.
+
+    Returns (words, limit, offset), raising ValueError on a malformed option.
+    A limit of 0 shows everything.
+    """
+    try:
+        words = shlex.split(args or '')
+    except ValueError:
+        words = (args or '').split()  # Unbalanced quote, e.g. an apostrophe in a header
+    rest = []
+    options = {'--limit': PAGE_SIZE, '--offset': 0}
+    words = iter(words)
+    for word in words:
+        if word in options:
+            value = next(words, '')
+            if not value.isdigit():
+                raise ValueError(f"{word} expects a non-negative number.")
+            options[word] = int(value)
+        else:
+            rest.append(word)
+    return rest, options['--limit'], options['--offset']
+
+def page(lines, limit=PAGE_SIZE, offset=0, stream=None):
+    """Prints one page of an iterable of lines to stream (stdout by default), consuming only the lines it shows.
+
+    Returns the number of lines printed.
+    """
+    shown = 0
+    for line in itertools.islice(lines, offset, None):
+        if limit and shown == limit:
+            print(f"-- More: continue with --offset {offset + shown} --", file=stream)
+            break
+        print(line, file=stream)
+        shown += 1
+    return shown
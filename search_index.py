@@ -0,0 +1,113 @@
+import os
+from note_cache import open_cache_db
+from vault_scan import notes_of, scan_vault
+
+SEARCH_FILE = 'search_index.sqlite'
+SEARCH_VERSION = 2
+
+class SearchIndex:
+    """Full-text index of note sections, stored in an SQLite FTS5 table and ranked with BM25.
+
+    Each group/subgroup of a note is indexed as its own section, so results
+    carry their heading context. Notes are re-indexed only when their
+    (mtime, size) changed.
+    """
+
+    def __init__(self, vault_path, note_cache):
+        self.vault_path = vault_path
+        self.note_cache = note_cache
+        self._db = None
+        self._loaded = False
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def ensure_loaded(self, files=None):
+        """Opens the index and brings it up to date on first use, from files when the caller already scanned the vault."""
+        if not self._loaded:
+            self._db = self._open_db()
+            self.refresh(files)
+            self._loaded = True
+
+    def _open_db(self):
+        db = open_cache_db(self.vault_path, SEARCH_FILE, SEARCH_VERSION, ['files', 'section_files', 'sections'])
+        db.executescript('''
+            CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER);
+            CREATE TABLE IF NOT EXISTS section_files (rowid INTEGER PRIMARY KEY, file_id INTEGER);
+            CREATE INDEX IF NOT EXISTS section_files_file ON section_files (file_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS sections USING fts5(heading, body, tokenize = 'unicode61 remove_diacritics 2');
+        ''')
+        db.commit()
+        return db
+
+    def refresh(self, files=None):
+        """Indexes the sections of new or changed notes of a scan_vault result and drops deleted notes."""
+        notes = notes_of(scan_vault(self.vault_path) if files is None else files)
+        stamps = {path: (mtime_ns, size) for path, mtime_ns, size in self._db.execute('SELECT path, mtime_ns, size FROM files')}
+        for rel_path, stamp in notes.items():
+            if stamps.get(rel_path) != stamp:
+                self._index_note(os.path.join(self.vault_path, rel_path), rel_path, stamp)
+        for rel_path in stamps.keys() - notes.keys():
+            self._delete(rel_path)
+        self._db.commit()
+
+    def update_file(self, path):
+        st = os.stat(path)
+        self._index_note(path, os.path.relpath(path, self.vault_path), (st.st_mtime_ns, st.st_size))
+        self._db.commit()
+
+    def remove_file(self, path):
+        self._delete(os.path.relpath(path, self.vault_path))
+        self._db.commit()
+
+    def search(self, query, limit=20):
+        """Returns (path, heading, snippet) for the best matching sections, best first."""
+        # Quote every term so user input is never parsed as FTS5 syntax; terms are ANDed
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        if not terms:
+            return []
+        rows = self._db.execute('''
+            SELECT files.path, sections.heading, snippet(sections, 1, '[', ']', '...', 12)
+            FROM sections
+            JOIN section_files ON section_files.rowid = sections.rowid
+            JOIN files ON files.id = section_files.file_id
+            WHERE sections MATCH ?
+            ORDER BY bm25(sections, 2.0, 1.0)
+            LIMIT ?''', (' '.join(terms), limit))
+        return [(path, heading, ' '.join(snippet.split())) for path, heading, snippet in rows]
+
+    def _index_note(self, path, rel_path, stamp):
+        self._delete(rel_path)
+        cursor = self._db.execute('INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)', (rel_path, *stamp))
+        file_id = cursor.lastrowid
+
+        reader = self.note_cache.get(path)
+        for heading, body in self._sections(reader):
+            cursor = self._db.execute('INSERT INTO sections (heading, body) VALUES (?, ?)', (heading, body))
+            self._db.execute('INSERT INTO section_files (rowid, file_id) VALUES (?, ?)', (cursor.lastrowid, file_id))
+
+    def _sections(self, reader):
+        """Yields (heading, text) for every group/subgroup of a note, and for its lines outside any group."""
+        preamble = reader.get_preamble()
+        if preamble:
+            yield os.path.splitext(reader.file_name)[0], '\n'.join(preamble)  # Headed by the note name
+        for group in reader.get_group_titles():
+            for subgroup in reader.get_subgroup_titles(group):
+                if group is None or subgroup == group:
+                    heading = subgroup
+                else:
+                    heading = f"{group} > {subgroup}"
+                lines = []
+                for line in reader.get_content(group, subgroup):
+                    # '###' headers are stored as (title, lines) tuples
+                    lines.append(line[0] if isinstance(line, tuple) else line)
+                yield heading, '\n'.join(lines)
+
+    def _delete(self, rel_path):
+        row = self._db.execute('SELECT id FROM files WHERE path = ?', (rel_path,)).fetchone()
+        if row is None:
+            return
+        self._db.execute('DELETE FROM sections WHERE rowid IN (SELECT rowid FROM section_files WHERE file_id = ?)', row)
+        self._db.execute('DELETE FROM section_files WHERE file_id = ?', row)
+        self._db.execute('DELETE FROM files WHERE id = ?', row)
@@ -0,0 +1,51 @@
+"""Incremental issue reports: cached findings are dropped when their inputs change.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from issue_reporter import IssueReporter
+from note_cache import NoteCache
+
+class MagicLinksInvalidationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.vault = self.tmp.name
+        self.write('00 - Races/Elfes/Elfes.md', '# Magie\nline ![[Feu]]\n')
+        self.write('01 - Magies/Sub/Feu.md', '# Feu\n')
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.vault, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    def magic_issues(self):
+        # A new reporter, as a new run would, reading the state of the previous ones
+        reporter = IssueReporter(self.vault, NoteCache(self.vault, persist=False))
+        return [issue.message for issue in reporter.report_races(['Elfes']) if issue.check == 'magic-links']
+
+    def test_link_to_magic_subfolder(self):
+        self.assertEqual(self.magic_issues(), [])
+        self.assertEqual(self.magic_issues(), [])  # Reused from the state, still right
+
+    def test_deleted_magic_in_subfolder(self):
+        self.assertEqual(self.magic_issues(), [])
+        os.remove(os.path.join(self.vault, '01 - Magies/Sub/Feu.md'))
+        self.assertEqual(self.magic_issues(), ["No links to magic files found in 'Elfes.md'."])
+
+    def test_same_named_note_outside_the_magics(self):
+        self.assertEqual(self.magic_issues(), [])
+        self.write('Feu.md', '# Feu\n')  # Closer to the root, so the link now resolves to it
+        self.assertEqual(self.magic_issues(), ["No links to magic files found in 'Elfes.md'."])
+
+if __name__ == "__main__":
+    unittest.main()
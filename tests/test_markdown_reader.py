@@ -0,0 +1,107 @@
+"""Parity of MarkdownReader with the original regex/defaultdict parser.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_reader import MarkdownReader
+
+def reference_parse(text):
+    """The original _parse_markdown_content, returning (content, links) as plain dicts."""
+    content = {}
+    links = {}
+    current_group = None
+    current_subgroup = None
+
+    for line in text.split('\n'):
+        if line.startswith('# '):
+            current_group = line.strip().lstrip('#').strip()
+            content[current_group] = {}
+            current_subgroup = None
+        elif line.startswith('## '):
+            current_subgroup = line.strip().lstrip('#').strip()
+            content.setdefault(current_group, {})[current_subgroup] = []
+        elif line.startswith('### '):
+            current_subsubgroup = line.strip().lstrip('#').strip()
+            if current_subgroup:
+                content[current_group][current_subgroup].append((current_subsubgroup, []))
+            else:
+                content.setdefault(current_group, {})[current_subsubgroup] = []
+        elif line.strip():
+            for link in re.findall(r'!\[\[(.*?)\]\]', line):
+                links[current_group] = links.get(current_group, []) + [link]
+            if current_subgroup:
+                content[current_group][current_subgroup].append(line)
+            elif current_group:
+                content[current_group][current_group] = content[current_group].get(current_group, []) + [line]
+    return content, links
+
+PIECES = ['# G{}', '## S{}', '### T{}', '### T{} ![[y{}]]', 'text {}', '', '   ', '#nospace {}',
+          'l ![[M{}]] and ![[N{}|alias]]', '## ', '# ', '  indented ![[I{}#h]]']
+
+def random_note(rng):
+    lines = [rng.choice(PIECES).format(rng.randint(0, 3), rng.randint(0, 3)) for _ in range(rng.randint(0, 30))]
+    return '\n'.join(lines) + rng.choice(['', '\n'])
+
+class MarkdownReaderParityTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def read(self, text, lazy=False):
+        path = os.path.join(self.tmp.name, 'note.md')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return MarkdownReader(path, self.tmp.name, lazy=lazy)
+
+    def assert_parity(self, text, lazy=False):
+        reader = self.read(text, lazy)
+        content, links = reference_parse(text)
+        self.assertEqual(reader.content, content, text)
+        self.assertEqual(reader.links, links, text)
+        for group in content:
+            self.assertEqual(reader.get_subgroup_titles(group), list(content[group]), text)
+            for subgroup in content[group]:
+                # As before, an empty subgroup title ('## ') selects the whole group
+                expected = content[group][subgroup] if subgroup else content[group]
+                self.assertEqual(reader.get_content(group, subgroup), expected, text)
+
+    def test_subsubgroup_links_are_not_collected(self):
+        self.assert_parity('# G\n## S\nx ![[x]]\n### T ![[y]]\n')
+        self.assertEqual(self.read('# G\n## S\nx ![[x]]\n### T ![[y]]\n').links, {'G': ['x']})
+
+    def test_generated_notes(self):
+        rng = random.Random(2009)
+        for index in range(2000):
+            self.assert_parity(random_note(rng), lazy=index % 2 == 0)
+
+    def test_front_matter_is_not_content(self):
+        reader = self.read('---\nh1: [G]\ntags: [race]\n---\n# G\n## S\nline ![[M]]\n')
+        self.assertEqual(reader.property, {'h1': ['G'], 'tags': ['race']})
+        self.assertEqual(reader.content, {'G': {'S': ['line ![[M]]']}})
+        self.assertEqual(reader.links, {'G': ['M']})
+
+class MarkdownReaderLazyTest(unittest.TestCase):
+    def test_failed_body_read_raises_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'note.md')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('---\nh1: [G]\n---\n# G\nline\n')
+            reader = MarkdownReader(path, tmp, lazy=True)
+            os.remove(path)
+            for _ in range(2):
+                with self.assertRaises(FileNotFoundError):
+                    reader.content
+            self.assertFalse(reader.body_loaded)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""NoteCache storage: readers round-trip through plain JSON data.
+
+Run from the repository root:
+
+    python -m pytest tests
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_reader import MarkdownReader
+from note_cache import CACHE_DIR, CACHE_FILE, NoteCache, dump_reader, load_reader
+from test_markdown_reader import random_note
+
+class NoteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.vault = self.tmp.name
+
+    def write(self, name, text):
+        path = os.path.join(self.vault, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def assert_same_reader(self, reader, loaded):
+        self.assertEqual(loaded.property, reader.property)
+        self.assertEqual(loaded.body_loaded, reader.body_loaded)
+        self.assertEqual(loaded.content, reader.content)
+        self.assertEqual(loaded.links, reader.links)
+        self.assertEqual(loaded.get_preamble(), reader.get_preamble())
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        for index in range(300):
+            path = self.write('note.md', '---\nh1: [G0]\ncreated: 2024-05-01\n---\n' + random_note(rng))
+            reader = MarkdownReader(path, self.vault, lazy=index % 2 == 0)
+            data = dump_reader(reader)
+            self.assertIsNotNone(data)
+            self.assert_same_reader(reader, load_reader(path, self.vault, data))
+
+    def test_dates_are_kept(self):
+        path = self.write('note.md', '---\ncreated: 2024-05-01\nseen: 2024-05-01 10:30:00\n---\n# G\n')
+        loaded = load_reader(path, self.vault, dump_reader(MarkdownReader(path, self.vault)))
+        self.assertEqual(loaded.property['created'], datetime.date(2024, 5, 1))
+        self.assertEqual(loaded.property['seen'], datetime.datetime(2024, 5, 1, 10, 30))
+
+    def test_front_matter_not_representable_is_not_stored(self):
+        path = self.write('note.md', '---\n1: one\n---\n# G\n')
+        self.assertIsNone(dump_reader(MarkdownReader(path, self.vault)))
+
+    def test_disk_tier_across_instances(self):
+        path = self.write('note.md', '---\ntags: [race]\n---\n# G\n## S\nline ![[M]]\n')
+        cache = NoteCache(self.vault)
+        reader = cache.get(path)
+        reader.links  # Parse the body, so the saved entry is complete
+        cache.save()
+
+        loaded = NoteCache(self.vault).get(path)
+        self.assertTrue(loaded.body_loaded)
+        self.assert_same_reader(reader, loaded)
+
+    def test_whole_vault_pass_is_written_in_batches(self):
+        cache = NoteCache(self.vault, max_entries=4)
+        for index in range(10):
+            cache.get(self.write(f'note{index}.md', f'# G{index}\n'))
+        # Written as the pass goes, without waiting for save()
+        self.assertEqual(cache._db.execute('SELECT COUNT(*) FROM notes').fetchone()[0], 8)
+        cache.save()
+        self.assertEqual(cache._db.execute('SELECT COUNT(*) FROM notes').fetchone()[0], 10)
+
+    def test_read_only_cache_exports_its_parses(self):
+        path = self.write('note.md', '# G\nline ![[M]]\n')
+        worker = NoteCache(self.vault, read_only=True)
+        worker.get(path).links
+        worker.save()
+        self.assertEqual(len(worker.exported), 1)
+        self.assertEqual(worker._db.execute('SELECT COUNT(*) FROM notes').fetchone()[0], 0)
+
+        parent = NoteCache(self.vault)
+        parent.import_rows(worker.exported)
+        parent.save()
+        loaded = NoteCache(self.vault).get(path)
+        self.assertTrue(loaded.body_loaded)
+        self.assertEqual(loaded.links, {'G': ['M']})
+
+    def test_damaged_entry_is_parsed_again(self):
+        path = self.write('note.md', '# G\nline\n')
+        cache = NoteCache(self.vault)
+        cache.get(path)
+        cache.save()
+        cache._db.execute("UPDATE notes SET data = 'cos\\nsystem\\n'")
+        cache._db.commit()
+
+        self.assertEqual(NoteCache(self.vault).get(path).content, {'G': {'G': ['line']}})
+        self.assertTrue(os.path.exists(os.path.join(self.vault, CACHE_DIR, CACHE_FILE)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,279 @@
+import json
+import os
+from collections import defaultdict
+from note_cache import CACHE_DIR
+from vault_scan import notes_of, scan_vault
+
+INDEX_FILE = 'vault_index.json'
+INDEX_VERSION = 2
+
+def link_target(link):
+    """Strips the '#heading' and '|alias' parts of an embed, 'Folder/Name#Heading|alias' -> 'Folder/Name'."""
+    return link.split('|', 1)[0].split('#', 1)[0].strip().replace('\\', '/')
+
+class LinkResolver:
+    """Resolves embeds to files of the vault the way Obsidian does.
+
+    A target is matched by file name, or by its trailing path when it
+    contains a folder, case-insensitively; notes match without '.md'.
+    When several files match, the one in the linking note's folder wins,
+    then the one with the shortest path.
+    """
+
+    def __init__(self):
+        self.by_name = defaultdict(list)  # lower-case name, without '.md' for notes -> relative paths
+
+    @classmethod
+    def scan(cls, vault_path, files=None):
+        """Resolver over every file of the vault, from a scan_vault result or a new walk."""
+        resolver = cls()
+        for rel_path in (scan_vault(vault_path) if files is None else files):
+            resolver.add(rel_path)
+        return resolver
+
+    def add(self, rel_path):
+        paths = self.by_name[self._key(rel_path)]
+        if rel_path not in paths:
+            paths.append(rel_path)
+            paths.sort(key=lambda path: (path.count(os.sep), path))
+
+    def remove(self, rel_path):
+        key = self._key(rel_path)
+        paths = self.by_name.get(key, [])
+        if rel_path in paths:
+            paths.remove(rel_path)
+            if not paths:
+                del self.by_name[key]
+
+    def resolve(self, link, source=''):
+        """Returns the relative path an embed written in source points to, or None when it is broken."""
+        target = link_target(link).lower()
+        if target.endswith('.md'):
+            target = target[:-3]
+        if not target:
+            return None
+        candidates = self.by_name.get(target.rsplit('/', 1)[-1], [])
+        if '/' in target:
+            # A path, as Obsidian writes when the name alone is ambiguous
+            candidates = [path for path in candidates if self._stem(path) == target or self._stem(path).endswith('/' + target)]
+        if not candidates:
+            return None
+        folder = os.path.dirname(source)
+        return next((path for path in candidates if os.path.dirname(path) == folder), candidates[0])
+
+    def _key(self, rel_path):
+        name = os.path.basename(rel_path).lower()
+        return name[:-3] if name.endswith('.md') else name
+
+    def _stem(self, rel_path):
+        stem = rel_path.replace(os.sep, '/').lower()
+        return stem[:-3] if stem.endswith('.md') else stem
+
+class VaultIndex:
+    """Inverted index of links, backlinks, tags and headers across the whole vault.
+
+    The per-note records are stored in a compact JSON file under the cache
+    directory and validated by (mtime, size), so only changed notes are
+    re-read when the index is loaded again. Links are stored as written and
+    resolved with a LinkResolver kept up to date with the vault's files.
+    """
+
+    def __init__(self, vault_path, note_cache):
+        self.vault_path = vault_path
+        self.note_cache = note_cache
+        self.notes = {}  # relative path -> [mtime_ns, size, links, tags, headers]
+        self.attachments = set()  # Relative paths of the files other than notes, embeds may target them
+        self.resolver = LinkResolver()  # Every note and attachment, by name
+        self._links = None  # Resolved (edges, broken, incoming), dropped whenever a file changes
+        self.tags = defaultdict(set)  # tag -> relative paths
+        self.headers = defaultdict(set)  # h1/h2 -> relative paths
+        self._loaded = False
+        self._names_loaded = False  # Only the resolver is filled, from ensure_names
+        self._dirty = False
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def names_loaded(self):
+        return self._loaded or self._names_loaded
+
+    def ensure_names(self, files=None):
+        """Fills the resolver with the name of every file on first use, without reading any note.
+
+        Enough to resolve links until the index itself is needed.
+        """
+        if not self.names_loaded:
+            for rel_path in (scan_vault(self.vault_path) if files is None else files):
+                self.resolver.add(rel_path)
+            self._names_loaded = True
+
+    def ensure_loaded(self, files=None):
+        """Loads the stored index and brings it up to date on first use, from files when the caller already scanned the vault."""
+        if not self._loaded:
+            if self._names_loaded:
+                self.resolver = LinkResolver()  # Rebuilt from the records and the attachments below
+            self.load()
+            self.refresh(files)
+            self._loaded = True
+
+    def load(self):
+        try:
+            with open(self._index_path(), 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != INDEX_VERSION:
+            return False
+        for rel_path, record in data['notes'].items():
+            self._add(rel_path, record)
+        return True
+
+    def save(self):
+        if not self._dirty:
+            return
+        data = {'version': INDEX_VERSION, 'notes': self.notes}
+        try:
+            os.makedirs(os.path.join(self.vault_path, CACHE_DIR), exist_ok=True)
+            with open(self._index_path(), 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+            self._dirty = False
+        except OSError as e:
+            print(f"Could not save the vault index: {e}")
+
+    def refresh(self, files=None):
+        """Re-reads the new or changed notes of a scan_vault result, drops deleted ones and updates the attachments."""
+        files = scan_vault(self.vault_path) if files is None else files
+        notes = notes_of(files)
+        for rel_path in self.notes.keys() - notes.keys():
+            self._remove(rel_path)
+        for rel_path, stamp in notes.items():
+            self.update_file(os.path.join(self.vault_path, rel_path), stamp)
+        attachments = files.keys() - notes.keys()
+        for rel_path in attachments ^ self.attachments:
+            if rel_path in attachments:
+                self.resolver.add(rel_path)
+            else:
+                self.resolver.remove(rel_path)
+            self._links = None
+        self.attachments = attachments
+
+    def file_changed(self, path):
+        """Keeps the index up to date with a new or changed file, or only the resolver before the index is loaded."""
+        if self._loaded:
+            self.update_file(path)
+        elif self._names_loaded:
+            self.resolver.add(os.path.relpath(path, self.vault_path))
+
+    def file_removed(self, path):
+        if self._loaded:
+            self.remove_file(path)
+        elif self._names_loaded:
+            self.resolver.remove(os.path.relpath(path, self.vault_path))
+
+    def update_file(self, path, stamp=None):
+        """Re-indexes a single note if it changed since it was last indexed; other files are attachments."""
+        rel_path = os.path.relpath(path, self.vault_path)
+        if not rel_path.endswith('.md'):
+            if rel_path not in self.attachments:
+                self.attachments.add(rel_path)
+                self.resolver.add(rel_path)
+                self._links = None
+            return
+        if stamp is None:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        record = self.notes.get(rel_path)
+        if record and record[0] == stamp[0] and record[1] == stamp[1]:
+            return
+
+        reader = self.note_cache.get(path)
+        links = sorted({link_target(link) for group_links in reader.get_links().values() for link in group_links})
+        tags = sorted({tag.lower().lstrip('#') for tag in self._as_list(reader.get_property('tags'))})
+        headers = sorted({header.lower() for key in ('h1', 'h2') for header in self._as_list(reader.get_property(key))})
+
+        self._remove(rel_path)
+        self._add(rel_path, [stamp[0], stamp[1], links, tags, headers])
+
+    def remove_file(self, path):
+        rel_path = os.path.relpath(path, self.vault_path)
+        if rel_path in self.attachments:
+            self.attachments.discard(rel_path)
+            self.resolver.remove(rel_path)
+            self._links = None
+        self._remove(rel_path)
+
+    def backlinks_of(self, name):
+        """Notes embedding the note <name> resolves to, from the root of the vault."""
+        target = self.resolver.resolve(name)
+        return sorted(self.resolved_links()[2].get(target, ())) if target else []
+
+    def resolved_links(self):
+        """Resolves every stored embed in one pass and returns (edges, broken, incoming).
+
+        edges maps each note to the relative paths it embeds, broken lists the
+        (note, link) embeds resolving to nothing and incoming maps relative
+        paths to the notes embedding them. The result is cached until a file
+        is added, changed or removed.
+        """
+        if self._links is None:
+            edges, broken, incoming = {}, [], defaultdict(set)
+            for rel_path, record in self.notes.items():
+                targets = []
+                for link in record[2]:
+                    target = self.resolver.resolve(link, rel_path)
+                    if target is None:
+                        broken.append((rel_path, link))
+                    else:
+                        targets.append(target)
+                        incoming[target].add(rel_path)
+                edges[rel_path] = targets
+            self._links = (edges, sorted(broken), incoming)
+        return self._links
+
+    def tagged(self, tag):
+        return sorted(self.tags.get(tag.lower().lstrip('#'), ()))
+
+    def where(self, header):
+        return sorted(self.headers.get(header.lower(), ()))
+
+    def outgoing_links(self, rel_path):
+        record = self.notes.get(rel_path)
+        return record[2] if record else []
+
+    def _add(self, rel_path, record):
+        self.notes[rel_path] = record
+        self.resolver.add(rel_path)
+        self._links = None
+        _, _, links, tags, headers = record
+        for tag in tags:
+            self.tags[tag].add(rel_path)
+        for header in headers:
+            self.headers[header].add(rel_path)
+        self._dirty = True
+
+    def _remove(self, rel_path):
+        record = self.notes.pop(rel_path, None)
+        if record is None:
+            return
+        self.resolver.remove(rel_path)
+        self._links = None
+        _, _, links, tags, headers = record
+        for mapping, keys in ((self.tags, tags), (self.headers, headers)):
+            for key in keys:
+                mapping[key].discard(rel_path)
+                if not mapping[key]:
+                    del mapping[key]
+        self._dirty = True
+
+    def _as_list(self, value):
+        # Front matter values may be a single string, a list or missing
+        if not value:
+            return []
+        if isinstance(value, (list, tuple, set)):
+            return [str(v) for v in value if v is not None]
+        return [str(value)]
+
+    def _index_path(self):
+        return os.path.join(self.vault_path, CACHE_DIR, INDEX_FILE)
@@ -1,178 +1,503 @@
-from markdown_reader import MarkdownReader
-from issue_reporter import IssueReporter
-import os
-import re
-import yaml
-import pandas as pd
-
-class VaultManager:
-    def __init__(self, vault_path):
-        self.vault_path = vault_path
-        self.current_path = vault_path  # Initialize current path to the vault directory
-        self.current_race = None  # To keep track of the opened race (MarkdownReader object)
-        self.group_map = {}  # To map group IDs to group names
-        self.issue_reporter = IssueReporter(vault_path)
-
-    def ls(self):
-        try:
-            items = os.listdir(self.current_path)
-            folders = [f for f in items if os.path.isdir(os.path.join(self.current_path, f)) and not f.startswith('.')]
-            files = [f for f in items if os.path.isfile(os.path.join(self.current_path, f)) and not f.startswith('.')]
-            
-            if folders or files:
-                print(f"Contents of '{self.current_path}':")
-                for folder in folders:
-                    cleaned_name = self._clean_folder_name(folder)
-                    print(f"📁 {cleaned_name}")
-                for file in files:
-                    print(f"📄 {file}")
-            else:
-                print(f"No folders or files found in '{self.current_path}'.")
-        except FileNotFoundError:
-            print(f"The path '{self.current_path}' does not exist.")
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-    def cd(self, folder_name):
-        if folder_name == "..":
-            new_path = os.path.dirname(self.current_path)
-            if os.path.commonpath([new_path, self.vault_path]) == self.vault_path:
-                self.current_path = new_path
-                print(f"Changed directory to '{self.current_path}'")
-                self.ls()
-            else:
-                print("You are at the root of the vault. Cannot go up further.")
-        else:
-            for f in os.scandir(self.current_path):
-                if f.is_dir() and self._clean_folder_name(f.name).lower() == folder_name.lower():
-                    new_path = os.path.join(self.current_path, f.name)
-                    self.current_path = new_path
-                    print(f"Changed directory to '{self.current_path}'")
-                    self.ls()
-                    return
-
-            print(f"Folder '{folder_name}' not found.")
-
-    def open(self, name):
-        races_path = os.path.join(self.vault_path, "00 - Races")
-        for f in os.scandir(races_path):
-            if f.is_file() and name.lower() in self._clean_folder_name(f.name).lower():
-                self.current_race = MarkdownReader(f.path, self.vault_path)
-                print(f"Race '{name}' opened.")
-                self.issue_reporter.report_issues(name)  # Use IssueReporter
-                return
-            elif f.is_dir() and self._clean_folder_name(f.name).lower() == name.lower():
-                race_file_path = os.path.join(f.path, f"{name}.md")
-                if os.path.isfile(race_file_path):
-                    self.current_race = MarkdownReader(race_file_path, self.vault_path)
-                    print(f"Race '{name}' opened from folder.")
-                    self.issue_reporter.report_issues(name)  # Use IssueReporter
-                    return
-                else:
-                    print(f"No '{name}.md' file found in folder '{f.name}'.")
-                    return
-
-        print(f"No file or folder containing '{name}' found in '00 - Races'.")
-
-    def close(self):
-        if self.current_race:
-            print(f"Race '{self.current_race.file_name}' closed.")
-            self.current_race = None
-        else:
-            print("No race is currently opened.")
-
-    def race_property(self, race_name=None):
-        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
-            print("Properties:")
-            for key, value in self.current_race.property.items():
-                print(f"{key}: {value}")
-        else:
-            print("No race is currently opened or wrong race name.")
-
-    def race_content(self, race_name=None):
-        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
-            print("Content:")
-            for title, content in self.current_race.content.items():
-                print(f"\nTitle: {title}\n{content}\n")
-        else:
-            print("No race is currently opened or wrong race name.")
-
-    def race_links(self, race_name=None):
-        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
-            print("Links:")
-            for key, value in self.current_race.get_links().items():
-                print(f"{key}: {value}")
-        else:
-            print("No race is currently opened or wrong race name.")
-
-    def race_city(self, race_name):
-        if self.current_race and race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower():
-            race_folder_name = self._clean_folder_name(self.current_race.file_name).rsplit('.', 1)[0]  # Removes .md extension
-            city_path = os.path.join(self.vault_path, "02 - Lieux", race_folder_name)
-            
-            if os.path.exists(city_path):
-                for f in os.scandir(city_path):
-                    if f.is_file() and f.name.endswith('.md'):
-                        city_name = os.path.splitext(f.name)[0]  # Remove .md extension
-                        tags = self._get_tags_from_file(os.path.join(city_path, f.name))
-                        city_type = "Capital" if "capitale" in tags else "City"
-                        print(f"{city_type}: {city_name}")
-            else:
-                print(f"No '02 - Lieux/{race_folder_name}' folder found.")
-        else:
-            print("No race is currently opened or wrong race name.")
-
-    def _get_tags_from_file(self, file_path):
-        """Extracts the tags from the front matter of a Markdown file."""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-            if match:
-                front_matter = yaml.safe_load(match.group(1))
-                return front_matter.get('tags', [])
-        return []
-
-    def help(self):
-        print("Available commands:")
-        print("  ls                     - List all folders and files in the current directory")
-        print("  cd <name>              - Change directory to <name> and list its contents")
-        print("  cd ..                  - Move to the parent directory")
-        print("  open <name>            - Open a Markdown file in '00 - Races' containing <name>' and report issues")
-        print("  close                  - Close the currently opened race")
-        print("  <race_name> property   - View the properties of the opened race")
-        print("  <race_name> content    - View the content of the opened race")
-        print("  <race_name> links      - View the links in the opened race")
-        print("  <race_name> city       - List all cities in the '02 - Lieux/<race_name>' folder")
-        print("  help                   - Show this help message")
-        print("  exit                   - Exit the program and clear the screen")
-
-    def run_command(self, command):
-        command_parts = command.split(maxsplit=1)
-        
-        if command_parts[0] in ['ls', 'cd', 'open', 'close', 'help', 'exit']:
-            command_method = getattr(self, command_parts[0], None)
-            if command_method:
-                command_method(*command_parts[1:])
-        elif len(command_parts) == 2:
-            race_command, action = command_parts
-            if action in ['property', 'content', 'links', 'city']:
-                command_method = getattr(self, f'race_{action}', None)
-                if command_method:
-                    command_method(race_command)
-        elif len(command_parts) == 1 and self.current_race:
-            # If only the action is given, assume it's for the currently opened race
-            action = command_parts[0]
-            if action in ['property', 'content', 'links', 'city']:
-                race_name = self._clean_folder_name(self.current_race.file_name)
-                command_method = getattr(self, f'race_{action}', None)
-                if command_method:
-                    command_method(race_name)
-            else:
-                print(f"Unknown command: {command}")
-        else:
-            print(f"Unknown command: {command}")
-
-    def _clean_folder_name(self, folder_name):
-        if ' - ' in folder_name:
-            return folder_name.split(' - ', 1)[1]
-        return folder_name
+from issue_reporter import IssueReporter
+from note_cache import NoteCache
+from vault_index import VaultIndex
+from search_index import SearchIndex
+from link_graph import LinkGraph
+from instrumentation import stats
+from vault_watcher import VaultWatcher
+from vault_scan import scan_vault
+from pager import page, parse_page_args
+import copy
+import itertools
+import os
+import sys
+import threading
+import weakref
+
+RACE_ACTIONS = ['property', 'content', 'links', 'city']
+
+class VaultManager:
+    def __init__(self, vault_path):
+        self.vault_path = vault_path
+        self.current_path = vault_path  # Initialize current path to the vault directory
+        self.current_race = None  # To keep track of the opened race (MarkdownReader object)
+        self.group_map = {}  # To map group IDs to group names
+        self.note_cache = NoteCache(vault_path)  # Shared parse cache for every note in the vault
+        self.vault_index = VaultIndex(vault_path, self.note_cache)  # Links, backlinks, tags and headers
+        self.issue_reporter = IssueReporter(vault_path, self.note_cache, get_resolver=self._link_resolver)
+        self.search_index = SearchIndex(vault_path, self.note_cache)  # Full-text index of note sections
+        self.link_graph = LinkGraph(self.vault_index)  # Embed analytics over the index's links
+        self.watcher = None  # Started on demand, see start_watcher
+        self.lock = threading.RLock()  # Serializes commands with the watcher's updates
+        self._sessions = weakref.WeakSet()  # Live sessions, shared by every copy
+        self._files = None  # scan_vault result of the running command, shared by the indexes it loads
+        self._stream = None  # Output of the running command, see run_command
+
+    @property
+    def out(self):
+        """Where commands print: the running command's stream, or stdout."""
+        return self._stream or sys.stdout
+
+    @property
+    def race_name(self):
+        """Name of the opened race, or None."""
+        return os.path.splitext(self.current_race.file_name)[0] if self.current_race else None
+
+    def session(self):
+        """Returns a VaultManager with its own current folder and race, sharing this one's caches and indexes."""
+        session = copy.copy(self)
+        session.current_path = self.vault_path
+        session.current_race = None
+        session._files = None
+        session.issue_reporter = copy.copy(self.issue_reporter)
+        session.issue_reporter.get_resolver = session._link_resolver  # Shares the session's scan of the vault
+        self._sessions.add(session)  # So the watcher refreshes its opened race too
+        return session
+
+    def ls(self, args=None):
+        try:
+            _, limit, offset = parse_page_args(args)
+        except ValueError as e:
+            print(f"{e} Usage: ls [--limit N] [--offset N]", file=self.out)
+            return
+        try:
+            entries = self._iter_entries()
+            first = next(entries, None)
+            if first is not None:
+                print(f"Contents of '{self.current_path}':", file=self.out)
+                page(itertools.chain([first], entries), limit, offset, stream=self.out)
+            else:
+                print(f"No folders or files found in '{self.current_path}'.", file=self.out)
+        except FileNotFoundError:
+            print(f"The path '{self.current_path}' does not exist.", file=self.out)
+        except Exception as e:
+            print(f"An error occurred: {e}", file=self.out)
+
+    def _iter_entries(self):
+        """Yields the listing lines of the current folder, folders first, from a single scandir pass."""
+        files = []
+        with os.scandir(self.current_path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                # DirEntry caches the type from the directory listing, no stat per entry
+                if entry.is_dir():
+                    yield f"📁 {self._clean_folder_name(entry.name)}"
+                elif entry.is_file():
+                    files.append(entry.name)
+        for file in files:
+            yield f"📄 {file}"
+
+    def cd(self, folder_name):
+        if folder_name == "..":
+            new_path = os.path.dirname(self.current_path)
+            if os.path.commonpath([new_path, self.vault_path]) == self.vault_path:
+                self.current_path = new_path
+                print(f"Changed directory to '{self.current_path}'", file=self.out)
+                self.ls()
+            else:
+                print("You are at the root of the vault. Cannot go up further.", file=self.out)
+        else:
+            for f in os.scandir(self.current_path):
+                if f.is_dir() and self._clean_folder_name(f.name).lower() == folder_name.lower():
+                    new_path = os.path.join(self.current_path, f.name)
+                    self.current_path = new_path
+                    print(f"Changed directory to '{self.current_path}'", file=self.out)
+                    self.ls()
+                    return
+
+            print(f"Folder '{folder_name}' not found.", file=self.out)
+
+    def open(self, name):
+        races_path = os.path.join(self.vault_path, "00 - Races")
+        for f in os.scandir(races_path):
+            if f.is_file() and name.lower() in self._clean_folder_name(f.name).lower():
+                self.current_race = self.note_cache.get(f.path)
+                print(f"Race '{name}' opened.", file=self.out)
+                self._report_race(name)  # Use IssueReporter
+                return
+            elif f.is_dir() and self._clean_folder_name(f.name).lower() == name.lower():
+                race_file_path = os.path.join(f.path, f"{self._clean_folder_name(f.name)}.md")  # The name typed is lowercased
+                if os.path.isfile(race_file_path):
+                    self.current_race = self.note_cache.get(race_file_path)
+                    print(f"Race '{name}' opened from folder.", file=self.out)
+                    self._report_race(name)  # Use IssueReporter
+                    return
+                else:
+                    print(f"No '{os.path.basename(race_file_path)}' file found in folder '{f.name}'.", file=self.out)
+                    return
+
+        print(f"No file or folder containing '{name}' found in '00 - Races'.", file=self.out)
+
+    def close(self):
+        if self.current_race:
+            print(f"Race '{self.current_race.file_name}' closed.", file=self.out)
+            self.current_race = None
+        else:
+            print("No race is currently opened.", file=self.out)
+
+    def race_property(self, race_name=None):
+        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
+            print("Properties:", file=self.out)
+            for key, value in self.current_race.property.items():
+                print(f"{key}: {value}", file=self.out)
+        else:
+            print("No race is currently opened or wrong race name.", file=self.out)
+
+    def race_content(self, race_name=None, args=None):
+        """Shows the opened race section by section, or only 'content <h1> [<h2>]', one page at a time."""
+        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
+            try:
+                words, limit, offset = parse_page_args(args)
+            except ValueError as e:
+                print(f"{e} Usage: content [<h1> [<h2>]] [--limit N] [--offset N]", file=self.out)
+                return
+            sections = self._select_sections(words)
+            if sections is None:
+                print(f"No section '{' '.join(words)}' in race '{self.race_name}'.", file=self.out)
+                return
+            print("Content:", file=self.out)
+            page(self._content_lines(sections), limit, offset, stream=self.out)
+        else:
+            print("No race is currently opened or wrong race name.", file=self.out)
+
+    def _select_sections(self, words):
+        """Resolves [<h1> [<h2>]] into the (group, subgroups) to show, or None when nothing matches."""
+        race = self.current_race
+        groups = race.get_group_titles()
+        if not words:
+            return [(group, race.get_subgroup_titles(group)) for group in groups]
+        # Headers may contain spaces, so try the words as one h1 before splitting them into h1 and h2
+        group = self._find_title(groups, ' '.join(words))
+        if group is not None:
+            return [(group, race.get_subgroup_titles(group))]
+        for split in range(len(words) - 1, 0, -1):
+            group = self._find_title(groups, ' '.join(words[:split]))
+            if group is not None:
+                subgroup = self._find_title(race.get_subgroup_titles(group), ' '.join(words[split:]))
+                if subgroup is not None:
+                    return [(group, [subgroup])]
+        return None
+
+    def _find_title(self, titles, name):
+        # Commands are lowercased, so match titles case-insensitively
+        return next((title for title in titles if str(title).lower() == name.lower()), None)
+
+    def _content_lines(self, sections):
+        """Yields the lines of each section, materializing one section at a time."""
+        race = self.current_race
+        for group, subgroups in sections:
+            yield f"\nTitle: {group}"
+            for subgroup in subgroups:
+                if subgroup != group:  # Lines written directly under the h1 are stored under its own title
+                    yield f"## {subgroup}"
+                for line in race.get_content(group, subgroup):
+                    yield f"### {line[0]}" if isinstance(line, tuple) else line
+
+    def race_links(self, race_name=None):
+        if self.current_race and (race_name is None or race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower()):
+            print("Links:", file=self.out)
+            for key, value in self.current_race.get_links().items():
+                print(f"{key}: {value}", file=self.out)
+        else:
+            print("No race is currently opened or wrong race name.", file=self.out)
+
+    def race_city(self, race_name):
+        if self.current_race and race_name.lower() == self._clean_folder_name(self.current_race.file_name).lower():
+            race_folder_name = self._clean_folder_name(self.current_race.file_name).rsplit('.', 1)[0]  # Removes .md extension
+            city_path = os.path.join(self.vault_path, "02 - Lieux", race_folder_name)
+            
+            if os.path.exists(city_path):
+                for f in os.scandir(city_path):
+                    if f.is_file() and f.name.endswith('.md'):
+                        city_name = os.path.splitext(f.name)[0]  # Remove .md extension
+                        tags = self._get_tags_from_file(os.path.join(city_path, f.name))
+                        city_type = "Capital" if "capitale" in tags else "City"
+                        print(f"{city_type}: {city_name}", file=self.out)
+            else:
+                print(f"No '02 - Lieux/{race_folder_name}' folder found.", file=self.out)
+        else:
+            print("No race is currently opened or wrong race name.", file=self.out)
+
+    def _get_tags_from_file(self, file_path):
+        """Extracts the tags from the front matter of a Markdown file."""
+        return self.note_cache.get(file_path).get_property('tags') or []
+
+    def report(self, name=None):
+        """Reports issues for <name>, every race with 'all', or the opened race when no name is given."""
+        if name == 'all':
+            races = self.issue_reporter.list_races()
+            if not races:
+                print("No race folders found in '00 - Races'.", file=self.out)
+                return
+            print(f"Issue report for {len(races)} races:\n", file=self.out)
+            self.issue_reporter.print_report(self.issue_reporter.report_all(), races=races, stream=self.out)
+            return
+        if name is None:
+            if not self.current_race:
+                print("No race is currently opened. Usage: report <race> | report all", file=self.out)
+                return
+            name = os.path.splitext(self.current_race.file_name)[0]
+
+        self._report_race(name)
+
+    def _report_race(self, name):
+        # Commands are lowercased, so match the race folder case-insensitively
+        races = {race.lower(): race for race in self.issue_reporter.list_races()}
+        name = races.get(name.lower(), name)
+        self.issue_reporter.print_report(self.issue_reporter.report_races([name]), races=[name], stream=self.out)
+
+    def backlinks(self, name=None):
+        """Lists the notes embedding <name>, or the opened race when no name is given."""
+        if name is None:
+            if not self.current_race:
+                print("No race is currently opened. Usage: backlinks <name>", file=self.out)
+                return
+            name = os.path.splitext(self.current_race.file_name)[0]
+
+        self._load_indexes(self.vault_index)
+        self._print_notes(f"Notes linking to '{name}':", self.vault_index.backlinks_of(name))
+
+    def tagged(self, tag=None):
+        if tag is None:
+            print("Usage: tagged <tag>", file=self.out)
+            return
+        self._load_indexes(self.vault_index)
+        self._print_notes(f"Notes tagged '{tag}':", self.vault_index.tagged(tag))
+
+    def where(self, header=None):
+        if header is None:
+            print("Usage: where <header>", file=self.out)
+            return
+        self._load_indexes(self.vault_index)
+        self._print_notes(f"Notes declaring header '{header}':", self.vault_index.where(header))
+
+    def search(self, query=None):
+        """Full-text search over every note, best matching sections first."""
+        if query is None:
+            print("Usage: search <query>", file=self.out)
+            return
+        import sqlite3
+
+        try:
+            self._load_indexes(self.search_index)
+            results = self.search_index.search(query)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Full-text search is unavailable: {e}", file=self.out)
+            return
+
+        if not results:
+            print(f"No notes matching '{query}'.", file=self.out)
+            return
+        print(f"Results for '{query}':", file=self.out)
+        for path, heading, snippet in results:
+            print(f"📄 {os.path.splitext(path)[0]} - {heading}", file=self.out)
+            print(f"    {snippet}", file=self.out)
+
+    def graph(self, args=None):
+        """Vault-wide embed analytics: broken embeds, orphan notes, unused magics or the race x magic matrix."""
+        usage = "Usage: graph broken|orphans|unused|matrix [<file.csv>] [--limit N] [--offset N]"
+        try:
+            words, limit, offset = parse_page_args(args)
+        except ValueError as e:
+            print(f"{e} {usage}", file=self.out)
+            return
+        action = words[0].lower() if words else None
+        if action not in ('broken', 'orphans', 'unused', 'matrix') or (words[1:] and action != 'matrix'):
+            print(usage, file=self.out)
+            return
+
+        self._load_indexes(self.vault_index)
+        graph = self.link_graph.build()
+        if action == 'broken':
+            self._page_notes("Broken embeds:", [f"{note}: ![[{link}]]" for note, link in graph.broken], limit, offset)
+        elif action == 'orphans':
+            self._page_notes("Notes without any embed to or from them:", graph.orphans(), limit, offset)
+        elif action == 'unused':
+            self._page_notes("Magics embedded by no note:", graph.unused_magics(), limit, offset)
+        else:
+            try:
+                matrix = graph.race_magic_matrix()
+            except ImportError as e:
+                print(f"The race x magic matrix needs pandas: {e}", file=self.out)
+                return
+            if words[1:]:
+                path = ' '.join(words[1:])
+                try:
+                    matrix.to_csv(path)
+                except OSError as e:
+                    print(f"Could not write '{path}': {e}", file=self.out)
+                    return
+                print(f"Race x magic matrix ({matrix.shape[0]} races, {matrix.shape[1]} magics) written to '{path}'.", file=self.out)
+            else:
+                print("Magic embeds per race:", file=self.out)
+                page(iter(matrix.to_string().splitlines()), limit, offset, stream=self.out)
+
+    def _page_notes(self, title, notes, limit, offset):
+        if notes:
+            print(f"{title} {len(notes)}", file=self.out)
+            page((f"📄 {note}" for note in notes), limit, offset, stream=self.out)
+        else:
+            print(f"{title} none found.", file=self.out)
+
+    def _load_indexes(self, *indexes):
+        """Brings indexes up to date on first use, sharing one walk of the vault between them."""
+        for index in indexes:
+            if not index.loaded:
+                index.ensure_loaded(self._vault_files())
+
+    def _link_resolver(self):
+        """The vault index's resolver, kept up to date by the watcher; resolving needs only the names, no note is read."""
+        if not self.vault_index.names_loaded:
+            self.vault_index.ensure_names(self._vault_files())
+        return self.vault_index.resolver
+
+    def _vault_files(self):
+        if self._files is None:
+            self._files = scan_vault(self.vault_path)
+        return self._files
+
+    def stats(self, action=None):
+        """Shows the recorded statistics, or switches them 'on', 'off' or 'reset's them."""
+        if action == 'on':
+            stats.enabled = True
+            print("Statistics enabled.", file=self.out)
+        elif action == 'off':
+            stats.enabled = False
+            print("Statistics disabled.", file=self.out)
+        elif action == 'reset':
+            stats.reset()
+            print("Statistics reset.", file=self.out)
+        elif action is None:
+            for line in stats.report():
+                print(line, file=self.out)
+        else:
+            print("Usage: stats [on|off|reset]", file=self.out)
+
+    def _print_notes(self, title, notes):
+        if notes:
+            print(title, file=self.out)
+            for note in notes:
+                print(f"📄 {os.path.splitext(note)[0]}", file=self.out)
+        else:
+            print(f"{title} none found.", file=self.out)
+
+    def help(self):
+        print("Available commands:", file=self.out)
+        print("  ls [--limit N] [--offset N]", file=self.out)
+        print("                         - List the folders and files in the current directory, one page at a time", file=self.out)
+        print("  cd <name>              - Change directory to <name> and list its contents", file=self.out)
+        print("  cd ..                  - Move to the parent directory", file=self.out)
+        print("  open <name>            - Open a Markdown file in '00 - Races' containing <name>' and report issues", file=self.out)
+        print("  close                  - Close the currently opened race", file=self.out)
+        print("  report [<race>|all]    - Report issues for a race, every race, or the opened race", file=self.out)
+        print("  <race_name> property   - View the properties of the opened race", file=self.out)
+        print("  <race_name> content [<h1> [<h2>]] [--limit N] [--offset N]", file=self.out)
+        print("                         - View the content of the opened race, or one section, one page at a time", file=self.out)
+        print("  <race_name> links      - View the links in the opened race", file=self.out)
+        print("  <race_name> city       - List all cities in the '02 - Lieux/<race_name>' folder", file=self.out)
+        print("  backlinks [<name>]     - List the notes linking to <name> or to the opened race", file=self.out)
+        print("  tagged <tag>           - List the notes tagged <tag>", file=self.out)
+        print("  where <header>         - List the notes declaring the h1 or h2 <header>", file=self.out)
+        print("  search <query>         - Search the text of every note, best matches first", file=self.out)
+        print("  graph broken|orphans|unused", file=self.out)
+        print("                         - List the broken embeds, the notes without embeds or the unused magics", file=self.out)
+        print("  graph matrix [<file.csv>]", file=self.out)
+        print("                         - Show the race x magic embed counts, or export them as CSV", file=self.out)
+        print("  stats [on|off|reset]   - Show per-command timings, files read and cache hits", file=self.out)
+        print("  help                   - Show this help message", file=self.out)
+        print("  exit                   - Exit the program and clear the screen", file=self.out)
+
+    def start_watcher(self, interval=2.0):
+        """Keeps caches, the index and the opened race up to date while the vault is edited."""
+        if self.watcher is None:
+            self.watcher = VaultWatcher(self.vault_path, self._on_files_changed, interval)
+            self.watcher.start()
+
+    def stop_watcher(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _on_files_changed(self, changed, removed):
+        with self.lock:
+            for path in removed:
+                self.vault_index.file_removed(path)
+                if path.endswith('.md'):
+                    self.note_cache.invalidate(path)
+                    if self.search_index.loaded:
+                        self.search_index.remove_file(path)
+
+            for path in changed:
+                try:
+                    self.vault_index.file_changed(path)  # Re-parses notes through the note cache
+                    if not path.endswith('.md'):
+                        continue  # Attachments only matter to the index's resolver
+                    if not self.vault_index.loaded:
+                        self.note_cache.get(path)
+                    if self.search_index.loaded:
+                        self.search_index.update_file(path)
+                except OSError:
+                    continue  # Deleted again since the scan
+
+            # Refresh the opened race in place, in this manager and in every session
+            changed_paths = {os.path.abspath(path) for path in changed}
+            for manager in [self, *self._sessions]:
+                if manager.current_race:
+                    race_path = os.path.abspath(manager.current_race.filepath)
+                    if race_path in changed_paths:
+                        manager.current_race = self.note_cache.get(race_path)
+
+            self.note_cache.save()
+            self.vault_index.save()
+
+    def run_command(self, command, stream=None):
+        """Runs a command, printing its output to stream, stdout by default."""
+        with self.lock, stats.command(command):
+            self._files = None  # Also when set by a direct call, the vault may have changed since
+            self._stream = stream  # Per manager, so sessions never write to each other's stream
+            try:
+                self._dispatch(command)
+            finally:
+                self._files = None
+                self._stream = None
+            self.note_cache.save()
+            self.vault_index.save()
+
+    def _dispatch(self, command):
+        # Commands are case-insensitive, but 'graph' takes a file path, which keeps its case
+        arguments = command.split(maxsplit=1)[1:]
+        command = command.lower()
+        command_parts = command.split(maxsplit=1)
+        
+        if command_parts[0] in ['ls', 'cd', 'open', 'close', 'report', 'backlinks', 'tagged', 'where', 'search', 'graph', 'stats', 'help', 'exit']:
+            command_method = getattr(self, command_parts[0], None)
+            if command_method:
+                command_method(*(arguments if command_parts[0] == 'graph' else command_parts[1:]))
+        elif command_parts[0] in RACE_ACTIONS and self.current_race:
+            # If only the action is given, assume it's for the currently opened race
+            race_name = self._clean_folder_name(self.current_race.file_name)
+            self._race_action(command_parts[0], race_name, command_parts[1:], command)
+        elif len(command_parts) == 2:
+            race_command, rest = command_parts
+            action, *args = rest.split(maxsplit=1)
+            if action in RACE_ACTIONS:
+                self._race_action(action, race_command, args, command)
+            else:
+                print(f"Unknown command: {command}", file=self.out)
+        else:
+            print(f"Unknown command: {command}", file=self.out)
+
+    def _race_action(self, action, race_name, args, command):
+        command_method = getattr(self, f'race_{action}')
+        if action == 'content':
+            command_method(race_name, *args)  # Only content takes section and paging arguments
+        elif args:
+            print(f"Unknown command: {command}", file=self.out)
+        else:
+            command_method(race_name)
+
+    def _clean_folder_name(self, folder_name):
+        if ' - ' in folder_name:
+            return folder_name.split(' - ', 1)[1]
+        return folder_name
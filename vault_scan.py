@@ -0,0 +1,34 @@
+import os
+
+def scan_vault(vault_path):
+    """Returns {relative path: (mtime_ns, size)} for every file of the vault, skipping hidden files and folders.
+
+    This is the one walk of the vault: the watcher polls with it and the
+    indexes refresh from it, so callers needing several can share a scan.
+    """
+    files = {}
+    pending = [(vault_path, '')]
+    while pending:
+        folder, rel_folder = pending.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel_path = os.path.join(rel_folder, entry.name) if rel_folder else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, rel_path))
+                    elif entry.is_file():
+                        st = entry.stat()
+                        files[rel_path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    continue  # Deleted while scanning
+    return files
+
+def notes_of(files):
+    """The Markdown notes of a scan_vault result."""
+    return {rel_path: stamp for rel_path, stamp in files.items() if rel_path.endswith('.md')}
@@ -0,0 +1,165 @@
+import hashlib
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from vault_manager import VaultManager
+
+def socket_dir():
+    """Directory of the sockets, only accessible by the current user."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir  # Already private to the user
+
+    user = os.getuid() if hasattr(os, 'getuid') else os.getlogin()
+    path = os.path.join(tempfile.gettempdir(), f'obsidian_terminal-{user}')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    # The temp dir is shared, refuse a directory someone else created or opened up
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or (hasattr(os, 'getuid') and st.st_uid != os.getuid()) or st.st_mode & 0o077:
+        raise RuntimeError(f"'{path}' must be a directory owned by and only accessible to the current user.")
+    return path
+
+def default_socket_path(vault_path):
+    """Socket of the server for a vault, short enough for the Unix socket path limit."""
+    digest = hashlib.blake2b(os.path.abspath(vault_path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(socket_dir(), f'obsidian_terminal-{digest}.sock')
+
+class VaultServer:
+    """Daemon keeping a warm VaultManager in memory and serving its commands over a Unix socket.
+
+    The protocol is one JSON object per line: clients send {"command": ...}
+    and receive {"output": ..., "race": ..., "path": ...}. Every connection
+    gets its own session (current folder and opened race) while sharing the
+    caches and indexes. Each command prints to its own buffer, never to the
+    process's stdout, where the vault watcher reports its errors.
+
+    Commands run one at a time on a single worker thread, so the event loop
+    keeps accepting and reading clients meanwhile. They also hold the
+    VaultManager lock shared with the watcher, so a slow command, e.g. the
+    first 'search' indexing the vault, delays every other client until it
+    is done.
+    """
+
+    def __init__(self, vault_manager, socket_path=None):
+        self.vault_manager = vault_manager
+        self.socket_path = socket_path or default_socket_path(vault_manager.vault_path)
+        self._executor = None
+
+    def serve_forever(self):
+        # Only the server needs asyncio, clients stay quick to start
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            asyncio.run(self._serve())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._executor.shutdown(wait=False)
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    async def _serve(self):
+        import asyncio
+
+        if os.path.exists(self.socket_path):
+            client = VaultClient.connect(self.vault_manager.vault_path, self.socket_path)
+            if client:
+                client.close()
+                raise RuntimeError(f"A server is already listening on '{self.socket_path}'.")
+            os.remove(self.socket_path)  # Left behind by a server that did not shut down cleanly
+
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)  # Clients run commands that write files, keep other users out
+        print(f"Serving '{self.vault_manager.vault_path}' on '{self.socket_path}'.", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_client(self, reader, writer):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        session = self.vault_manager.session()
+        try:
+            while line := await reader.readline():
+                try:
+                    command = str(json.loads(line).get('command', '')).strip()
+                except (ValueError, AttributeError):
+                    response = {'error': "Invalid request, expected a JSON object with a 'command'."}
+                else:
+                    buffer = io.StringIO()
+                    try:
+                        await loop.run_in_executor(self._executor, self._run, session, command, buffer)
+                        response = {}
+                    except Exception as e:
+                        # Keep the connection, the client reports the error and can go on
+                        response = {'error': f"Error in command '{command}': {e}"}
+                    response.update(output=buffer.getvalue(), race=session.race_name, path=session.current_path)
+                writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _run(self, session, command, buffer):
+        if command:
+            session.run_command(command, buffer)
+
+class VaultClient:
+    """Thin client sending commands to a running VaultServer, usable in place of a VaultManager."""
+
+    _clean_folder_name = VaultManager._clean_folder_name  # Used by tab completion
+
+    def __init__(self, vault_path, connection):
+        self.vault_path = os.path.abspath(vault_path)
+        self.current_path = self.vault_path
+        self.race_name = None
+        self._connection = connection
+        self._file = connection.makefile('rwb')
+
+    @classmethod
+    def connect(cls, vault_path, socket_path=None):
+        """Returns a client connected to the vault's server, or None when no server is running."""
+        if not hasattr(socket, 'AF_UNIX'):
+            return None
+        try:
+            socket_path = socket_path or default_socket_path(vault_path)
+        except (OSError, RuntimeError):
+            return None  # No usable socket directory, so no server either
+        if not os.path.exists(socket_path):
+            return None
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            connection.close()
+            return None
+        return cls(vault_path, connection)
+
+    def run_command(self, command, stream=None):
+        self._file.write(json.dumps({'command': command}, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The vault server closed the connection.")
+        response = json.loads(line)
+        stream = stream or sys.stdout
+        stream.write(response.get('output', ''))  # Partial output when the command failed
+        if 'error' in response:
+            print(response['error'], file=stream)
+        if 'race' in response:
+            self.race_name = response['race']
+            self.current_path = response['path']
+
+    def start_watcher(self):
+        pass  # The server watches the vault
+
+    def close(self):
+        self._file.close()
+        self._connection.close()
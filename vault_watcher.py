@@ -0,0 +1,39 @@
+import os
+import threading
+from vault_scan import scan_vault
+
+class VaultWatcher(threading.Thread):
+    """Background thread that polls the vault and reports changed or deleted files.
+
+    Each poll takes a scan_vault snapshot of (mtime, size) for every file and
+    hands only the differences to on_change(changed_paths, removed_paths).
+    """
+
+    def __init__(self, vault_path, on_change, interval=2.0):
+        super().__init__(name='VaultWatcher', daemon=True)
+        self.vault_path = vault_path
+        self.on_change = on_change
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._snapshot = None  # Taken by the thread itself, so starting the watcher never blocks
+
+    def scan(self):
+        """Returns {path: (mtime_ns, size)} for every file, skipping hidden ones."""
+        return {os.path.join(self.vault_path, rel_path): stamp for rel_path, stamp in scan_vault(self.vault_path).items()}
+
+    def run(self):
+        self._snapshot = self.scan()
+        while not self._stop_event.wait(self.interval):
+            snapshot = self.scan()
+            changed = [path for path, stamp in snapshot.items() if self._snapshot.get(path) != stamp]
+            removed = [path for path in self._snapshot if path not in snapshot]
+            self._snapshot = snapshot
+            if changed or removed:
+                try:
+                    self.on_change(changed, removed)
+                except Exception as e:
+                    # Never let a bad note kill the watcher
+                    print(f"\nVault watcher error: {e}")
+
+    def stop(self):
+        self._stop_event.set()